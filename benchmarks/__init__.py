@@ -0,0 +1,17 @@
+"""
+benchmarks - timing and scaling checks for the geometry code
+============================================================
+
+The benchmarks are written in the airspeed velocity (asv) style:
+classes with "params", a "setup" method and "time_*" methods.  Each
+module can also be run on its own from the top of the repository,
+which needs nothing beyond numpy and scipy::
+
+    > python -m benchmarks.bench_regions
+
+All of the benchmarks can be run without asv, reporting the time and
+peak memory of each benchmark for each problem size::
+
+    > python -m benchmarks.run
+
+"""
@@ -0,0 +1,141 @@
+"""
+Benchmarks for the plotting functions of pybob.spatial.plotutils.
+
+Everything is drawn with the Agg backend, and each benchmark includes
+a draw of the canvas so that the cost of the artists is counted along
+with the cost of building them.
+
+"""
+#
+# Copyright (C)  Robert T. Short, 2019.
+#
+# Distributed under the same BSD license as Scipy.
+#
+
+import numpy as np
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+
+from scipy.spatial import Voronoi, SphericalVoronoi
+
+from benchmarks.common import SIZES, randomPoints, spherePoints
+
+from pybob.spatial.plotutils import voronoi_plot_2d, voronoi_raster_2d, voronoi_plot_sphere
+
+
+class VoronoiPlot2D:
+
+    params      = SIZES
+    param_names = ['npoints']
+    timeout     = 600
+
+    def setup(self, npoints):
+        self.vor = Voronoi(randomPoints(npoints))
+
+    def teardown(self, npoints):
+        plt.close('all')
+
+    def time_voronoi_plot_2d(self, npoints):
+        fig = plt.figure()
+        voronoi_plot_2d(self.vor, ax=fig.add_subplot(111), show_points=False,
+                        show_vertices=False)
+        fig.canvas.draw()
+        plt.close(fig)
+
+    def time_voronoi_plot_2d_lod(self, npoints):
+        fig = plt.figure()
+        voronoi_plot_2d(self.vor, ax=fig.add_subplot(111), show_points=False,
+                        show_vertices=False, lod=True)
+        fig.canvas.draw()
+        plt.close(fig)
+
+    def peakmem_voronoi_plot_2d(self, npoints):
+        fig = plt.figure()
+        voronoi_plot_2d(self.vor, ax=fig.add_subplot(111), show_points=False,
+                        show_vertices=False)
+        fig.canvas.draw()
+        plt.close(fig)
+
+
+class VoronoiRaster2D:
+
+    params      = SIZES
+    param_names = ['npoints']
+    timeout     = 600
+
+    def setup(self, npoints):
+        self.vor = Voronoi(randomPoints(npoints))
+
+    def teardown(self, npoints):
+        plt.close('all')
+
+    def time_voronoi_raster_2d(self, npoints):
+        fig = plt.figure()
+        voronoi_raster_2d(self.vor, ax=fig.add_subplot(111), show_points=False,
+                          extent=(0, 1, 0, 1), shape=(1000, 1000))
+        fig.canvas.draw()
+        plt.close(fig)
+
+    def peakmem_voronoi_raster_2d(self, npoints):
+        fig = plt.figure()
+        voronoi_raster_2d(self.vor, ax=fig.add_subplot(111), show_points=False,
+                          extent=(0, 1, 0, 1), shape=(1000, 1000))
+        fig.canvas.draw()
+        plt.close(fig)
+
+
+class ZoomedVoronoiPlot2D:
+
+    params      = SIZES
+    param_names = ['npoints']
+    timeout     = 600
+
+    def setup(self, npoints):
+        self.fig = plt.figure()
+        self.ax  = self.fig.add_subplot(111)
+        voronoi_plot_2d(Voronoi(randomPoints(npoints)), ax=self.ax, show_points=False,
+                        show_vertices=False, lod=True)
+        self.fig.canvas.draw()
+        self.step = 0
+
+    def teardown(self, npoints):
+        plt.close('all')
+
+    def time_pan(self, npoints):
+        # A view with about a hundred sites in it, moved on every call.
+        self.step += 1
+        width = min(1.0, 10/np.sqrt(npoints))
+        x0 = (0.37*self.step) % (1 - width) if width < 1 else 0
+        self.ax.set_xlim(x0, x0 + width)
+        self.ax.set_ylim(x0, x0 + width)
+        self.fig.canvas.draw()
+
+
+class VoronoiPlotSphere:
+
+    # Drawing the million point diagram takes too long.
+    params      = [npoints for npoints in SIZES if npoints <= 10**5]
+    param_names = ['npoints']
+    timeout     = 600
+
+    def setup(self, npoints):
+        self.vor = SphericalVoronoi(spherePoints(npoints))
+
+    def teardown(self, npoints):
+        plt.close('all')
+
+    def time_voronoi_plot_sphere(self, npoints):
+        fig = plt.figure()
+        voronoi_plot_sphere(self.vor, ax=fig.add_subplot(111, projection='3d'),
+                            show_sphere=False, show_points=False, show_vertices=False)
+        fig.canvas.draw()
+        plt.close(fig)
+
+    def peakmem_voronoi_plot_sphere(self, npoints):
+        fig = plt.figure()
+        voronoi_plot_sphere(self.vor, ax=fig.add_subplot(111, projection='3d'),
+                            show_sphere=False, show_points=False, show_vertices=False)
+        fig.canvas.draw()
+        plt.close(fig)
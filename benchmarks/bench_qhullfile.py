@@ -0,0 +1,56 @@
+"""
+Benchmarks for reading and writing qhull files with
+pybob.spatial.qhullfile.
+
+"""
+#
+# Copyright (C)  Robert T. Short, 2019.
+#
+# Distributed under the same BSD license as Scipy.
+#
+
+import os
+import shutil
+import tempfile
+
+from benchmarks.common import SIZES, randomPoints
+
+from pybob.spatial.qhullfile import readQhullFile, readQhullBlocks, writeQhullFile
+
+
+class QhullFileIO:
+
+    params      = [SIZES, [2, 3]]
+    param_names = ['npoints', 'ndim']
+    timeout     = 600
+
+    def setup(self, npoints, ndim):
+        self.directory = tempfile.mkdtemp()
+        self.points    = randomPoints(npoints, ndim)
+        self.filename  = os.path.join(self.directory, 'points')
+        self.output    = os.path.join(self.directory, 'output')
+        writeQhullFile(self.filename, self.points)
+
+    def teardown(self, npoints, ndim):
+        shutil.rmtree(self.directory)
+
+    def time_readQhullFile(self, npoints, ndim):
+        readQhullFile(self.filename)
+
+    def time_readQhullFile_cached(self, npoints, ndim):
+        # The first call writes the sidecar, the rest map it.
+        readQhullFile(self.filename, cache=True)
+
+    def time_readQhullBlocks(self, npoints, ndim):
+        ndim, npoints, blocks = readQhullBlocks(self.filename)
+        for block in blocks:
+            pass
+
+    def time_writeQhullFile(self, npoints, ndim):
+        writeQhullFile(self.output, self.points)
+
+    def peakmem_readQhullFile(self, npoints, ndim):
+        readQhullFile(self.filename)
+
+    def peakmem_writeQhullFile(self, npoints, ndim):
+        writeQhullFile(self.output, self.points)
@@ -0,0 +1,129 @@
+"""
+Benchmarks for pybob.spatial.plotutils.getVoronoiRegions.
+
+Run as a script to check that region extraction scales (close to)
+linearly with the number of sites, that clipped regions tile the clip
+box, and to compare the memory used by the list and compact (CSR)
+output modes::
+
+    > python -m benchmarks.bench_regions
+
+"""
+#
+# Copyright (C)  Robert T. Short, 2019.
+#
+# Distributed under the same BSD license as Scipy.
+#
+
+import numpy
+
+from benchmarks.common import SIZES, randomPoints, timeCall, memoryUsage, scalingExponent
+
+from scipy.spatial import Voronoi, ConvexHull
+from pybob.spatial.plotutils import getVoronoiRegions, VoronoiRegions
+
+
+class RegionExtraction:
+
+    params      = SIZES
+    param_names = ['npoints']
+    timeout     = 600
+
+    def setup(self, npoints):
+        self.vor = Voronoi(randomPoints(npoints))
+
+    def time_getVoronoiRegions(self, npoints):
+        getVoronoiRegions(self.vor)
+
+    def time_getVoronoiRegions_compact(self, npoints):
+        getVoronoiRegions(self.vor, compact=True)
+
+    def time_getVoronoiRegions_clipped(self, npoints):
+        getVoronoiRegions(self.vor, compact=True, clip=(0, 0, 1, 1))
+
+    def peakmem_getVoronoiRegions(self, npoints):
+        getVoronoiRegions(self.vor)
+
+    def peakmem_getVoronoiRegions_compact(self, npoints):
+        getVoronoiRegions(self.vor, compact=True)
+
+
+class LazyRegions:
+
+    params      = [10**3, 10**4, 10**5, 10**6]
+    param_names = ['npoints']
+    timeout     = 600
+
+    def setup(self, npoints):
+        points     = randomPoints(npoints)
+        self.vor   = Voronoi(points)
+        self.sites = randomPoints(300, ndim=1, seed=1)[:,0]*npoints
+        #  Random sites are almost never on the hull, so look the
+        #  unbounded regions up separately.
+        self.hull_sites = ConvexHull(points).vertices[:300]
+
+    def time_sparse_lookup(self, npoints):
+        regions = VoronoiRegions(self.vor)
+        for site in self.sites.astype(int):
+            regions[site]
+
+    def time_hull_lookup(self, npoints):
+        regions = VoronoiRegions(self.vor)
+        for site in self.hull_sites:
+            regions[site]
+
+
+def clippedArea(vor, clip):
+    """
+    Total area of the regions of vor clipped to the box clip.  It
+    should be the area of the box, whatever the sites.
+    """
+    offsets, coords = getVoronoiRegions(vor, compact=True, clip=clip)
+    x, y  = coords[:,0], coords[:,1]
+    owner = numpy.repeat(numpy.arange(len(offsets)-1), numpy.diff(offsets))
+    nxt   = numpy.arange(len(coords)) + 1
+    nxt[offsets[1:][numpy.diff(offsets) > 0] - 1] = offsets[:-1][numpy.diff(offsets) > 0]
+    cross = x*y[nxt] - x[nxt]*y
+    return numpy.abs(numpy.bincount(owner, weights=cross, minlength=len(offsets)-1)).sum()/2
+
+
+#  Sites with a far outlier, whose region is bounded by two nearly
+#  opposite unbounded ridges, and the clip box to use with each.
+def _outlierCases():
+    grid = numpy.stack(numpy.meshgrid(numpy.arange(6), numpy.arange(6)), -1).reshape(-1, 2)
+    yield numpy.vstack((randomPoints(50), [[100, 0.5]])), (-200, -200, 200, 200)
+    yield numpy.vstack((grid, [[100, 2.5]])), (-150, -150, 150, 150)
+
+
+if __name__ == "__main__":
+
+    for points, clip in _outlierCases():
+        for furthest_site in (False, True):
+            area = clippedArea(Voronoi(points, furthest_site=furthest_site), clip)
+            box  = (clip[2] - clip[0])*(clip[3] - clip[1])
+            if abs(area - box) > 1e-9*box:
+                raise SystemExit('clipped regions cover %g of a clip box of area %g' % (area, box))
+
+    sizes = [npoints for npoints in SIZES if npoints >= 10**3]
+    times = []
+    for npoints in sizes:
+        vor = Voronoi(randomPoints(npoints))
+        elapsed, polygons = timeCall(getVoronoiRegions, vor)
+        assert len(polygons) == npoints
+        times.append(elapsed)
+        print('%8d sites  %10.3f s  %8.3f us/site' % (npoints, elapsed, 1e6*elapsed/npoints))
+
+    slope = scalingExponent(sizes, times)
+    print('scaling exponent %.2f' % slope)
+
+    print()
+    print('memory (MB)       list: peak  retained   compact: peak  retained')
+    for npoints in sizes:
+        vor = Voronoi(randomPoints(npoints))
+        lpeak, lheld, _ = memoryUsage(getVoronoiRegions, vor)
+        cpeak, cheld, _ = memoryUsage(getVoronoiRegions, vor, compact=True)
+        print('%8d sites  %10.1f %9.1f %15.1f %9.1f' %
+              (npoints, lpeak/2**20, lheld/2**20, cpeak/2**20, cheld/2**20))
+
+    if slope > 1.25:
+        raise SystemExit('getVoronoiRegions is not scaling linearly')
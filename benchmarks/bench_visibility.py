@@ -0,0 +1,51 @@
+"""
+Benchmarks for convex hulls and facet visibility, the work done by the
+visible2d and visible3d scripts.
+
+"""
+#
+# Copyright (C)  Robert T. Short, 2019.
+#
+# Distributed under the same BSD license as Scipy.
+#
+
+import numpy
+
+from scipy.spatial import ConvexHull
+
+from benchmarks.common import SIZES, randomPoints
+
+from pybob.spatial.visibility import classifyFacets, visibleFacets, horizonRidges
+
+
+class HullVisibility:
+
+    params      = [SIZES, [2, 3]]
+    param_names = ['npoints', 'ndim']
+    timeout     = 600
+
+    def setup(self, npoints, ndim):
+        # Points in the unit cube, viewed from just outside one corner.
+        self.points     = randomPoints(npoints, ndim)
+        self.viewpoint  = numpy.full(ndim, -0.1)
+        self.viewpoints = randomPoints(100, ndim, seed=1) - 1.0
+        self.hull       = ConvexHull(self.points)
+        self.visible    = visibleFacets(self.hull, self.viewpoint)
+
+    def time_qhull_good(self, npoints, ndim):
+        # The original approach: add the viewpoint and let qhull mark
+        # the good facets.
+        epoints = numpy.vstack((self.points, self.viewpoint))
+        ConvexHull(epoints, qhull_options='QG%d' % npoints)
+
+    def time_classifyFacets(self, npoints, ndim):
+        classifyFacets(self.points, self.viewpoint)
+
+    def time_visibleFacets_100(self, npoints, ndim):
+        visibleFacets(self.hull, self.viewpoints)
+
+    def time_horizonRidges(self, npoints, ndim):
+        horizonRidges(self.hull, self.visible)
+
+    def peakmem_classifyFacets(self, npoints, ndim):
+        classifyFacets(self.points, self.viewpoint)
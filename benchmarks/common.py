@@ -0,0 +1,106 @@
+"""
+Shared helpers for the benchmarks.
+
+"""
+#
+# Copyright (C)  Robert T. Short, 2019.
+#
+# Distributed under the same BSD license as Scipy.
+#
+
+import os
+import sys
+import time
+
+import numpy
+
+#  The scripts in geometry import pybob.spatial from the geometry
+#  directory, so do the same here.
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                '..', 'geometry'))
+
+#  Problem sizes, in points, shared by the benchmarks that sweep the
+#  full range.
+SIZES = [10, 100, 10**3, 10**4, 10**5, 10**6]
+
+
+def randomPoints(npoints, ndim=2, seed=0):
+    """
+    Uniformly distributed random points in the unit cube.
+
+    Parameters
+    ----------
+    npoints : Number of points.
+    ndim : Number of dimensions.
+    seed : Seed for the random number generator.
+
+    Returns
+    -------
+    points : (npoints, ndim) ndarray of points.
+
+    """
+    return numpy.random.RandomState(seed).uniform(size=(npoints, ndim))
+
+
+def spherePoints(npoints, seed=0):
+    """
+    Uniformly distributed random points on the unit sphere.
+
+    Returns
+    -------
+    points : (npoints, 3) ndarray of points.
+
+    """
+    points = numpy.random.RandomState(seed).normal(size=(npoints, 3))
+    return points/numpy.linalg.norm(points, axis=1)[:,None]
+
+
+def timeCall(func, *args, **kw):
+    """
+    Time a single call of func(*args, **kw).
+
+    Returns
+    -------
+    elapsed : Wall clock time in seconds.
+    result : Whatever func returned.
+
+    """
+    start  = time.perf_counter()
+    result = func(*args, **kw)
+    return time.perf_counter() - start, result
+
+
+def scalingExponent(sizes, times):
+    """
+    Least squares slope of log(time) against log(size).
+
+    A slope near 1 means the timed code scales linearly with the size.
+
+    """
+    return numpy.polyfit(numpy.log(sizes), numpy.log(times), 1)[0]
+
+
+def memoryUsage(func, *args, **kw):
+    """
+    Memory allocated by a single call of func(*args, **kw).
+
+    Numpy reports its array allocations to tracemalloc, so this covers
+    both Python objects and array data.
+
+    Returns
+    -------
+    peak : Peak traced memory during the call, in bytes.
+    retained : Traced memory still held by the result, in bytes.
+    result : Whatever func returned.
+
+    """
+    import tracemalloc
+
+    tracemalloc.start()
+    try:
+        base     = tracemalloc.get_traced_memory()[0]
+        result   = func(*args, **kw)
+        retained, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak - base, retained - base, result
@@ -0,0 +1,185 @@
+"""
+Run all of the benchmarks without asv.
+
+Every benchmark class in the bench_* modules is set up for each of its
+parameter combinations, and each time_* method is timed and its peak
+memory measured with tracemalloc.  The peakmem_* methods are only for
+asv, since the time_* methods are measured for memory here anyway.
+tracemalloc sees Python and numpy allocations but not qhull's own, so
+the memory reported for the hull benchmarks is a lower bound.
+One line is printed per benchmark and size, followed by the scaling
+exponent of each benchmark over the sizes of 1000 points and more::
+
+    > python -m benchmarks.run
+    > python -m benchmarks.run visibility --max-size 100000 --json results.jsonl
+    > python -m benchmarks.run --max-exponent 1.3
+
+"""
+#
+# Copyright (C)  Robert T. Short, 2019.
+#
+# Distributed under the same BSD license as Scipy.
+#
+
+import argparse
+import importlib
+import inspect
+import itertools
+import json
+import pkgutil
+import sys
+import time
+
+from benchmarks.common import memoryUsage, scalingExponent
+
+
+def benchmarkClasses(pattern=None, err=sys.stderr):
+    """
+    (module name, class) for each benchmark class whose module or class
+    name contains pattern.
+
+    If pattern is part of any module names, only those modules are
+    imported.  Otherwise every module is imported to look for matching
+    classes.  A module that fails to import is reported to err and
+    skipped.
+    """
+    import benchmarks
+
+    names = sorted(info.name for info in pkgutil.iter_modules(benchmarks.__path__)
+                   if info.name.startswith('bench_'))
+    if pattern is not None and any(pattern in name for name in names):
+        names = [name for name in names if pattern in name]
+
+    for module_name in names:
+        try:
+            module = importlib.import_module('benchmarks.' + module_name)
+        except Exception as e:
+            print('skipping %s: %s: %s' % (module_name, type(e).__name__, e), file=err)
+            continue
+        for name, cls in inspect.getmembers(module, inspect.isclass):
+            if cls.__module__ != module.__name__ or not hasattr(cls, 'params'):
+                continue
+            if pattern is None or pattern in module_name or pattern in name:
+                yield module_name, cls
+
+
+def parameterSets(cls):
+    """
+    The parameter combinations of a benchmark class, as dictionaries.
+    """
+    names  = list(cls.param_names)
+    params = cls.params if len(names) > 1 else [cls.params]
+    return [dict(zip(names, values)) for values in itertools.product(*params)]
+
+
+def bestTime(method, args, budget=0.2, repeat=10):
+    """
+    Best of up to repeat calls, stopping once budget seconds are spent.
+    """
+    best  = float('inf')
+    spent = 0.0
+    for count in range(repeat):
+        start = time.perf_counter()
+        method(*args)
+        elapsed = time.perf_counter() - start
+        best    = min(best, elapsed)
+        spent  += elapsed
+        if spent > budget:
+            break
+    return best
+
+
+def runBenchmarks(pattern=None, max_size=None, out=sys.stdout):
+    """
+    Run the benchmarks, printing one line per benchmark and parameter set.
+
+    Returns
+    -------
+    results : List of dictionaries with keys benchmark, params, time
+        (seconds) and peakmem (bytes).
+
+    """
+    results = []
+    for module_name, cls in benchmarkClasses(pattern):
+        methods = [name for name in dir(cls) if name.startswith('time_')]
+        for params in parameterSets(cls):
+            if max_size is not None and params.get('npoints', 0) > max_size:
+                continue
+            bench = cls()
+            args  = list(params.values())
+            try:
+                if hasattr(bench, 'setup'):
+                    bench.setup(*args)
+            except NotImplementedError:
+                continue
+            try:
+                for name in methods:
+                    method = getattr(bench, name)
+                    elapsed = bestTime(method, args)
+                    peak, _, _ = memoryUsage(method, *args)
+                    result = dict(benchmark='%s.%s.%s' % (module_name, cls.__name__, name),
+                                  params=params, time=elapsed, peakmem=peak)
+                    results.append(result)
+                    print('%-64s %-24s %10.4f s %9.1f MB' %
+                          (result['benchmark'], ' '.join('%s=%s' % item for item in params.items()),
+                           elapsed, peak/2**20), file=out, flush=True)
+            finally:
+                if hasattr(bench, 'teardown'):
+                    bench.teardown(*args)
+    return results
+
+
+def scalingExponents(results, min_size=10**3):
+    """
+    Scaling exponent with npoints of each benchmark and set of other
+    parameters that has at least three sizes of min_size or more.
+    """
+    series = {}
+    for result in results:
+        params = dict(result['params'])
+        npoints = params.pop('npoints', None)
+        if npoints is None or npoints < min_size:
+            continue
+        key = (result['benchmark'], tuple(sorted(params.items())))
+        series.setdefault(key, []).append((npoints, result['time']))
+
+    exponents = {}
+    for key, values in series.items():
+        if len(values) >= 3:
+            sizes, times = zip(*values)
+            exponents[key] = scalingExponent(sizes, times)
+    return exponents
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description='Run the benchmarks and report the time and '
+                                     'peak memory for each size.')
+    parser.add_argument('pattern', nargs='?',
+                        help='only run benchmarks whose module or class name contains this')
+    parser.add_argument('--max-size', type=int,
+                        help='skip parameter sets with more points than this')
+    parser.add_argument('--json', metavar='FILE',
+                        help='also write the results as JSON lines')
+    parser.add_argument('--max-exponent', type=float,
+                        help='fail if any benchmark scales worse than this')
+    args = parser.parse_args()
+
+    results = runBenchmarks(args.pattern, args.max_size)
+
+    if args.json:
+        with open(args.json, 'w') as out:
+            for result in results:
+                out.write(json.dumps(result) + '\n')
+
+    print()
+    failed = []
+    for (benchmark, params), exponent in sorted(scalingExponents(results).items()):
+        print('%-64s %-24s exponent %.2f' %
+              (benchmark, ' '.join('%s=%s' % item for item in params), exponent))
+        if args.max_exponent is not None and exponent > args.max_exponent:
+            failed.append(benchmark)
+
+    if failed:
+        raise SystemExit('%d benchmarks scale worse than exponent %g'
+                         % (len(failed), args.max_exponent))
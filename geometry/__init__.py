@@ -25,6 +25,8 @@ will have to build scipy from the github sources.
    appendzero
    visible2d
    visible3d
+   visiblebatch
+   renderbatch
    qhulldata
    pybob
 
@@ -33,5 +35,7 @@ will have to build scipy from the github sources.
 import geometry.appendzero
 import geometry.visible2d
 import geometry.visible3d
+import geometry.visiblebatch
+import geometry.renderbatch
 import geometry.qhulldata
 import geometry.pybob
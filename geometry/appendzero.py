@@ -9,6 +9,12 @@ appends the origin and writes the modified file to the standard output
 in qhull format.  This is mostly for experimenting with visible
 facets.  See the qhull documentation for the qhull file format.
 
+Other viewpoints can be appended instead of the origin by giving them
+on the command line, each as a comma separated list of coordinates.
+The file is streamed: only the header is changed, the point lines are
+copied through as they are, so files of any size can be piped through
+in constant memory.
+
 Example
 -------
 From the command line::
@@ -16,13 +22,13 @@ From the command line::
     > cat qhulldata/visible1 | ./appendzero.py:
     2
     8
-    2.8357815 1.91145534
-    2.55940908 2.69475804
-    1.35189884 2.95484612
-    1.02629326 2.23106931
-    1.35493431 1.21118976
-    2.28381929 1.26192649
-    2.09812 1.80199967
+    2.8357815   1.91145534
+    2.55940908  2.69475804
+    1.35189884  2.95484612
+    1.02629326  2.23106931
+    1.35493431  1.21118976
+    2.28381929  1.26192649
+    2.09812     1.80199967
     0.0 0.0
     > cat qhulldata/visible1 | ./appendzero.py | qhull i QG0 Qt:
     3
@@ -34,6 +40,7 @@ From the command line::
     5 0 
     0 1 
     1 2
+    > cat qhulldata/visible1 | ./appendzero.py 1,1 -4,4 | qhull i QG7 Qt
 
 """
 #
@@ -44,20 +51,74 @@ From the command line::
 
 
 import sys
-import numpy
+import argparse
 
-if __name__ == "__main__":
+_COPY_SIZE = 1 << 20
+
+def appendViewpoints(infile, outfile, viewpoints=None):
+    """
+    Copy a qhull file, appending points to it.
+
+    Parameters
+    ----------
+    infile : Binary file object with the qhull file to copy.
+    outfile : Binary file object to write the extended qhull file to.
+    viewpoints : Sequence of points to append.  Each must have as many
+        coordinates as the points in the file.  None or empty appends
+        the origin.
+
+    """
+    # As in qhullfile._readHeader, only the first token of each header
+    # line counts, so rbox headers such as "2 rbox 10 D2" are fine.
+    header = infile.readline()
+    try:
+        ndim    = int(header.split()[0])
+        npoints = int(infile.readline().split()[0])
+    except (IndexError, ValueError):
+        raise ValueError("the input is not a qhull point file")
+    if not viewpoints:
+        viewpoints = [[0.0]*ndim]
+    for viewpoint in viewpoints:
+        if len(viewpoint) != ndim:
+            raise ValueError("viewpoint %s is not %d-D" % (viewpoint, ndim))
 
-    ndim    = int(sys.stdin.readline())
-    npoints = int(sys.stdin.readline())
-    points = numpy.zeros((npoints,ndim))
-    for npt in range(npoints):
-        points[npt] = numpy.fromstring(sys.stdin.readline(), sep=' ')
+    # Keep the first line, and any comment on it, as it is.
+    outfile.write(header.rstrip(b'\r\n') + b'\n%d\n' % (npoints+len(viewpoints)))
+
+    last = b'\n'
+    while True:
+        chunk = infile.read(_COPY_SIZE)
+        if not chunk:
+            break
+        outfile.write(chunk)
+        last = chunk[-1:]
+    if last != b'\n':
+        outfile.write(b'\n')
+
+    for viewpoint in viewpoints:
+        outfile.write(' '.join('%r' % float(x) for x in viewpoint).encode() + b'\n')
+
+if __name__ == "__main__":
 
-    points = numpy.vstack((points, numpy.zeros(ndim)))
+    parser = argparse.ArgumentParser(description='Append viewpoints (default: the origin) '
+                                     'to a qhull file on the standard input.')
+    parser.add_argument('viewpoints', nargs='*', metavar='x,y,...',
+                        help='viewpoint coordinates, comma separated (negative '
+                        'coordinates, as in -1,2, are fine)')
+    # argparse would take a viewpoint like -1,2 for an option, so
+    # everything but the help option goes after a '--'.
+    argv = sys.argv[1:]
+    if '--' not in argv:
+        options = [arg for arg in argv if arg in ('-h', '--help')]
+        argv    = options + ['--'] + [arg for arg in argv if arg not in options]
+    args = parser.parse_args(argv)
 
-    print(ndim)
-    print(npoints+1)
+    try:
+        viewpoints = [[float(x) for x in v.split(',')] for v in args.viewpoints]
+    except ValueError as err:
+        parser.error(str(err))
 
-    for row in points:
-        print(' '.join('%s' % p for p in row))
+    try:
+        appendViewpoints(sys.stdin.buffer, sys.stdout.buffer, viewpoints)
+    except ValueError as err:
+        parser.error(str(err))
@@ -11,7 +11,15 @@ gods of scipy.spatial, be included in) the scipy.spatial module.
 
    pybob.spatial.qhullfile
    pybob.spatial.plotutils
+   pybob.spatial.visibility
+   pybob.spatial.qhullcache
+   pybob.spatial.tracing
+   pybob.spatial.rendering
 
 """
 #import geometry.pybob.spatial.qhullfile
 #import geometry.pybob.spatial.plotutils
+#import geometry.pybob.spatial.visibility
+#import geometry.pybob.spatial.qhullcache
+#import geometry.pybob.spatial.tracing
+#import geometry.pybob.spatial.rendering
@@ -8,35 +8,236 @@
 
 from __future__ import division, print_function, absolute_import
 
+import functools
+import operator
+
 import numpy as np
 from numpy import arctan2
 
-from scipy._lib.decorator import decorator as _decorator
+from .tracing import traced, span, count
 
-__all__ = ['delaunay_plot_2d', 'convex_hull_plot_2d', 'voronoi_plot_2d']
+__all__ = ['delaunay_plot_2d', 'convex_hull_plot_2d', 'voronoi_plot_2d', 'voronoi_raster_2d']
 
 
-@_decorator
-def _held_figure(func, obj, ax=None, **kw):
-    import matplotlib.pyplot as plt
+def _held_figure(func):
+    @functools.wraps(func)
+    def wrapper(obj, ax=None, **kw):
+        import matplotlib.pyplot as plt
 
-    if ax is None:
-        fig = plt.figure()
-        ax = fig.gca()
-        return func(obj, ax=ax, **kw)
-    else:
-        return func(obj, ax=ax, **kw)
+        if ax is None:
+            fig = plt.figure()
+            ax = fig.gca()
+            return func(obj, ax=ax, **kw)
+        else:
+            return func(obj, ax=ax, **kw)
+    return wrapper
 
-def _adjust_bounds(ax, points):
-    margin = 0.1 * points.ptp(axis=0)
+def _bounds(points):
+    margin = 0.1 * np.ptp(points, axis=0)
     xy_min = points.min(axis=0) - margin
     xy_max = points.max(axis=0) + margin
+    return xy_min, xy_max
+
+def _adjust_bounds(ax, points):
+    xy_min, xy_max = _bounds(points)
     ax.set_xlim(xy_min[0], xy_max[0])
     ax.set_ylim(xy_min[1], xy_max[1])
 
+def _addSegments(ax, segments, lod, **kw):
+    """
+    Add segments to ax as a LineCollection, or through a SegmentLOD.
+    """
+    from matplotlib.collections import LineCollection
+
+    if lod:
+        return SegmentLOD(ax, segments, **kw).collection
+    collection = LineCollection(segments, **kw)
+    ax.add_collection(collection)
+    return collection
+
+class _SegmentGrid:
+    """
+    Uniform grid over the bounding boxes of a set of segments.
+
+    Each segment is listed in every cell its bounding box touches, in
+    compact (CSR) form, so the cells of one grid row that a rectangle
+    covers are one contiguous slice.  Segments whose boxes span more
+    than max_cells cells (the long unbounded ridges of a Voronoi
+    diagram, say) are kept aside and always returned by query.
+    """
+
+    def __init__(self, lo, hi, per_cell=4, max_cells=16):
+        self.nsegments = nsegments = len(lo)
+        self.ncells    = max(1, int(np.sqrt(nsegments/per_cell)))
+        # Fit the grid to the bulk of the segments, so that a few far
+        # out ones (the ends of unbounded ridges) do not squeeze the rest
+        # into a handful of cells.  Those outside land in the edge cells.
+        if nsegments:
+            self.origin = np.percentile(lo, 1, axis=0)
+            extent      = np.percentile(hi, 99, axis=0) - self.origin
+        else:
+            self.origin = np.zeros(2)
+            extent      = np.ones(2)
+        self.size = np.where(extent > 0, extent, 1.0)/self.ncells
+
+        c0 = self._cells(lo)
+        c1 = self._cells(hi)
+        width   = c1 - c0 + 1
+        covered = width[:,0]*width[:,1]
+        large   = covered > max_cells
+        self.large = np.nonzero(large)[0]
+
+        ids     = np.nonzero(~large)[0]
+        covered = covered[ids]
+        rep     = np.repeat(ids, covered)
+        local   = np.arange(len(rep)) - np.repeat(np.cumsum(covered) - covered, covered)
+        cx = c0[rep,0] + local // width[rep,1]
+        cy = c0[rep,1] + local % width[rep,1]
+        cell = cx*self.ncells + cy
+
+        order = np.argsort(cell, kind='stable')
+        self.cell_segments = rep[order]
+        self.cell_offsets  = np.zeros(self.ncells**2 + 1, dtype=np.intp)
+        np.cumsum(np.bincount(cell, minlength=self.ncells**2), out=self.cell_offsets[1:])
+
+    def _cells(self, xy):
+        cells = np.floor((xy - self.origin)/self.size).astype(np.intp)
+        return np.clip(cells, 0, self.ncells - 1)
+
+    def query(self, x0, y0, x1, y1):
+        """
+        Indices of the segments that may intersect the rectangle, each once.
+        """
+        (cx0, cy0), (cx1, cy1) = self._cells(np.array([[x0, y0], [x1, y1]]))
+        if cx1 - cx0 + 1 == self.ncells and cy1 - cy0 + 1 == self.ncells:
+            return np.arange(self.nsegments)
+        offsets = self.cell_offsets
+        rows    = np.arange(cx0, cx1 + 1)*self.ncells
+        starts  = offsets[rows + cy0]
+        stops   = offsets[rows + cy1 + 1]
+        counts  = stops - starts
+        index   = np.arange(counts.sum()) + np.repeat(starts - (np.cumsum(counts) - counts), counts)
+        return np.union1d(self.cell_segments[index], self.large)
+
+class SegmentLOD:
+    """
+    A line collection that only holds the segments in view.
+
+    The segments are indexed once.  Each time the collection is drawn,
+    the view is compared with the one it was last drawn for, and if it
+    changed (after a pan, zoom or resize) the index is queried for the
+    segments that intersect the view and only those are handed to
+    matplotlib.  A pan or zoom therefore costs one query however many
+    limit callbacks it fires, and nothing is connected to the axes or
+    canvas, so clearing the axes frees everything.  Segments shorter
+    than min_pixels in both directions
+    are thinned to one per min_pixels square, so that a zoomed out view
+    of a huge diagram draws a bounded number of segments and still
+    shows where the diagram is dense.
+
+    Parameters
+    ----------
+    ax : matplotlib.axes.Axes instance.
+    segments : (n, 2, 2) array of segments.
+    min_pixels : Size, in pixels, below which segments are thinned.  0
+        turns the thinning off.
+    kw : Passed on to matplotlib.collections.LineCollection.
 
+    Attributes
+    ----------
+    collection : The LineCollection that is drawn.
+    shown : Indices of the segments currently in the collection, as of
+        the last draw or call of update.
+
+    Examples
+    --------
+
+    >>> lod = SegmentLOD(ax, segments, colors='k')
+    >>> ax.set_xlim(0, 0.01)        # the collection follows the view
+    >>> lod.remove()
+
+    """
+
+    def __init__(self, ax, segments, min_pixels=1.0, **kw):
+        self.ax         = ax
+        self.segments   = np.asarray(segments, dtype=float).reshape(-1, 2, 2)
+        self.min_pixels = min_pixels
+        self.lo         = self.segments.min(axis=1)
+        self.hi         = self.segments.max(axis=1)
+        self.grid       = _SegmentGrid(self.lo, self.hi)
+        self.shown      = np.empty(0, dtype=np.intp)
+        self._view      = None
+
+        # The collection refers back to this object, which lives as long
+        # as the collection is in the axes.
+        self.collection = _lodCollectionClass()([], **kw)
+        self.collection.lod = self
+        ax.add_collection(self.collection, autolim=False)
+        if len(self.segments):
+            ax.update_datalim(np.vstack((self.lo.min(axis=0), self.hi.max(axis=0))))
+
+    def update(self):
+        """Refresh the collection for the current view, if it changed."""
+        ax = self.ax
+        x0, x1 = sorted(ax.get_xlim())
+        y0, y1 = sorted(ax.get_ylim())
+        width, height = ax.bbox.width, ax.bbox.height
+        view = (x0, x1, y0, y1, width, height)
+        if view == self._view:
+            return
+        self._view = view
+
+        with span('SegmentLOD.update') as trace:
+            ids = self.grid.query(x0, y0, x1, y1)
+            lo, hi = self.lo[ids], self.hi[ids]
+            ids = ids[(lo[:,0] <= x1) & (hi[:,0] >= x0) & (lo[:,1] <= y1) & (hi[:,1] >= y0)]
+            nview = len(ids)
+
+            if self.min_pixels > 0 and len(ids) and x1 > x0 and y1 > y0:
+                # Thinning squares per data unit.
+                sx = width/(x1 - x0)/self.min_pixels
+                sy = height/(y1 - y0)/self.min_pixels
+                extent = self.hi[ids] - self.lo[ids]
+                small  = (extent[:,0]*sx < 1) & (extent[:,1]*sy < 1)
+                if small.any():
+                    tiny = ids[small]
+                    mid  = 0.5*(self.lo[tiny] + self.hi[tiny])
+                    px   = np.floor((mid[:,0] - x0)*sx).astype(np.int64)
+                    py   = np.floor((mid[:,1] - y0)*sy).astype(np.int64)
+                    _, first = np.unique(px*(int(height/self.min_pixels) + 2) + py,
+                                         return_index=True)
+                    ids = np.concatenate((ids[~small], tiny[first]))
+
+            self.shown = ids
+            self.collection.set_segments(self.segments[ids])
+            trace.count(nsegments=len(self.segments), nview=nview, nshown=len(ids))
+
+    def remove(self):
+        """Remove the collection from the axes."""
+        self.collection.remove()
+
+@functools.lru_cache(maxsize=None)
+def _lodCollectionClass():
+    """
+    The LineCollection subclass used by SegmentLOD, which brings its
+    SegmentLOD up to date with the view just before it is drawn.  It
+    is made on first use so that matplotlib is not imported with this
+    module.
+    """
+    from matplotlib.collections import LineCollection
+
+    class LODCollection(LineCollection):
+
+        def draw(self, renderer):
+            self.lod.update()
+            return super().draw(renderer)
+
+    return LODCollection
+
+
+@traced
 @_held_figure
-def delaunay_plot_2d(tri, ax=None):
+def delaunay_plot_2d(tri, ax=None, lod=False):
     """
     Plot the given Delaunay triangulation in 2-D
 
@@ -46,6 +247,9 @@ def delaunay_plot_2d(tri, ax=None):
         Triangulation to plot
     ax : matplotlib.axes.Axes instance, optional
         Axes to plot on
+    lod : bool, optional
+        Draw the edges through a SegmentLOD, which only draws the edges
+        in view.  For large triangulations.
 
     Returns
     -------
@@ -81,17 +285,24 @@ def delaunay_plot_2d(tri, ax=None):
     if tri.points.shape[1] != 2:
         raise ValueError("Delaunay triangulation is not 2-D")
 
+    count(npoints=len(tri.points), nsimplices=len(tri.simplices))
     x, y = tri.points.T
     ax.scatter(x, y)
-    ax.triplot(x, y, tri.simplices.copy())
+    if lod:
+        edges = tri.simplices[:,[[0, 1], [1, 2], [2, 0]]].reshape(-1, 2)
+        edges = np.unique(np.sort(edges, axis=1), axis=0)
+        SegmentLOD(ax, tri.points[edges], colors='C0')
+    else:
+        ax.triplot(x, y, tri.simplices.copy())
 
     _adjust_bounds(ax, tri.points)
 
     return ax.figure
 
 
+@traced
 @_held_figure
-def convex_hull_plot_2d(hull, ax=None):
+def convex_hull_plot_2d(hull, ax=None, lod=False):
     """
     Plot the given convex hull diagram in 2-D
 
@@ -101,6 +312,9 @@ def convex_hull_plot_2d(hull, ax=None):
         Convex hull to plot
     ax : matplotlib.axes.Axes instance, optional
         Axes to plot on
+    lod : bool, optional
+        Draw the hull through a SegmentLOD, which only draws the
+        segments in view.
 
     Returns
     -------
@@ -133,40 +347,80 @@ def convex_hull_plot_2d(hull, ax=None):
     >>> plt.show()
 
     """
-    from matplotlib.collections import LineCollection
-
     if hull.points.shape[1] != 2:
         raise ValueError("Convex hull is not 2-D")
 
+    count(npoints=len(hull.points), nfacets=len(hull.simplices))
     ax.scatter(hull.points[:,0], hull.points[:,1], marker='o', color='green')
-    line_segments = [hull.points[simplex] for simplex in hull.simplices]
-    ax.add_collection(LineCollection(line_segments,
-                                     colors='k',
-                                     linestyle='solid',
-                                     alpha=0.5))
+    line_segments = hull.points[hull.simplices]
+    _addSegments(ax, line_segments, lod,
+                 colors='k',
+                 linestyle='solid',
+                 alpha=0.5)
     _adjust_bounds(ax, hull.points)
 
     return ax.figure
 
 
-def infiniteRidge(vor, center,  ptp_bound, pointidx, simplex, furthest_site):
+def infiniteRidges(vor, center, ptp_bound, ridge_points, ridge_vertices, furthest_site):
+    """
+    Compute the drawable segments of a set of unbounded Voronoi ridges.
 
-    i = simplex[simplex >= 0][0]  # finite end Voronoi vertex
+    Each unbounded ridge runs from its finite Voronoi vertex out to
+    infinity.  The ridge is cut off at a far point, 2*ptp_bound.max()
+    from the finite vertex, along the normal of the line joining the
+    two sites that the ridge separates.  All of the ridges are done at
+    once.
 
-    t = vor.points[pointidx[1]] - vor.points[pointidx[0]]  # tangent
-    t /= np.linalg.norm(t)
-    n = np.array([-t[1], t[0]])  # normal
+    Parameters
+    ----------
+    vor : scipy.spatial.Voronoi instance.
+    center : Center of the Voronoi sites (usually vor.points.mean(axis=0)).
+    ptp_bound : Extent of the Voronoi sites along each axis.
+    ridge_points : (nridges, 2) array of the sites on either side of each ridge.
+    ridge_vertices : (nridges, 2) array of the Voronoi vertices of each
+        ridge.  One of the two is -1 (the vertex at infinity).
+    furthest_site: True for a furthest site diagram, false otherwise.
+
+    Returns
+    -------
+    segments : (nridges, 2, 2) ndarray.  segments[k,0] is the finite
+        vertex of ridge k and segments[k,1] the far point.
 
-    midpoint = vor.points[pointidx].mean(axis=0)
-    direction = np.sign(np.dot(midpoint - center, n)) * n
+    """
+    ridge_points   = np.asarray(ridge_points, dtype=np.intp).reshape(-1, 2)
+    ridge_vertices = np.asarray(ridge_vertices, dtype=np.intp).reshape(-1, 2)
+
+    i = ridge_vertices.max(axis=1)  # finite end Voronoi vertex
+
+    sites = vor.points[ridge_points]
+    t = sites[:,1] - sites[:,0]  # tangent
+    t /= np.linalg.norm(t, axis=1)[:,np.newaxis]
+    n = np.stack((-t[:,1], t[:,0]), axis=1)  # normal
+
+    midpoint = sites.mean(axis=1)
+    side = np.sign(np.einsum('ij,ij->i', midpoint - center, n))
+    direction = side[:,np.newaxis] * n
     if (furthest_site):
         direction = -direction
     far_point = vor.vertices[i] + direction * 2*ptp_bound.max()
 
-    return np.stack((vor.vertices[i], far_point))
+    return np.stack((vor.vertices[i], far_point), axis=1)
+
+def infiniteRidge(vor, center,  ptp_bound, pointidx, simplex, furthest_site):
+    """
+    Compute the drawable segment of a single unbounded Voronoi ridge.
+    See infiniteRidges, which does the same thing for many ridges at once.
+
+    Returns
+    -------
+    segment : (2, 2) ndarray with the finite vertex and the far point.
+
+    """
+    return infiniteRidges(vor, center, ptp_bound, [pointidx], [simplex], furthest_site)[0]
 
-    
 
+@traced
 @_held_figure
 def voronoi_plot_2d(vor, ax=None, **kw):
     """
@@ -190,6 +444,10 @@ def voronoi_plot_2d(vor, ax=None, **kw):
         Specifies the line alpha for polygon boundaries
     point_size: float, optional
         Specifies the size of points
+    lod: bool, optional
+        Draw the ridges through SegmentLOD collections, which only draw
+        the ridges in view and thin out those smaller than a pixel.
+        For interactive use with large diagrams.
 
 
     Returns
@@ -228,8 +486,6 @@ def voronoi_plot_2d(vor, ax=None, **kw):
     >>> plt.show()
 
     """
-    from matplotlib.collections import LineCollection
-
     if vor.points.shape[1] != 2:
         raise ValueError("Voronoi diagram is not 2-D")
 
@@ -239,43 +495,431 @@ def voronoi_plot_2d(vor, ax=None, **kw):
     if kw.get('show_vertices', True):
         ax.scatter(vor.vertices[:,0], vor.vertices[:,1], color='orange', marker='o')
 
-    furthest_site = vor.furthest_site
-
-    center = vor.points.mean(axis=0)
-    ptp_bound = vor.points.ptp(axis=0)
-
     line_colors = kw.get('line_colors', 'k')
     line_width = kw.get('line_width', 1.0)
     line_alpha = kw.get('line_alpha', 1.0)
 
-    finite_segments = []
-    infinite_segments = []
-    for pointidx, simplex in zip(vor.ridge_points, vor.ridge_vertices):
-        simplex = np.asarray(simplex)
-        if np.all(simplex >= 0):
-            finite_segments.append(vor.vertices[simplex])
-        else:
-            vertex = infiniteRidge(vor, center, ptp_bound, pointidx, simplex, furthest_site)
-            infinite_segments.append(vertex)
+    finite_segments, infinite_segments = _voronoiSegments(vor)
 
     #print('finite_segments\n', finite_segments)
     #print('infinite_segments\n', infinite_segments)
-    ax.add_collection(LineCollection(finite_segments,
-                                     colors=line_colors,
-                                     lw=line_width,
-                                     alpha=line_alpha,
-                                     linestyle='solid'))
-    ax.add_collection(LineCollection(infinite_segments,
-                                     colors=line_colors,
-                                     lw=line_width,
-                                     alpha=line_alpha,
-                                     linestyle='dashed'))
+    lod = kw.get('lod', False)
+    _addSegments(ax, finite_segments, lod,
+                 colors=line_colors,
+                 lw=line_width,
+                 alpha=line_alpha,
+                 linestyle='solid')
+    _addSegments(ax, infinite_segments, lod,
+                 colors=line_colors,
+                 lw=line_width,
+                 alpha=line_alpha,
+                 linestyle='dashed')
 
     _adjust_bounds(ax, np.vstack((vor.points,vor.vertices)))
 
     return ax.figure
 
-def getVoronoiRegions(vor):
+def _voronoiSegments(vor):
+    """
+    The finite ridges of a planar Voronoi diagram, and its unbounded
+    ridges cut off as in infiniteRidges, as two (n, 2, 2) arrays.
+    """
+    center = vor.points.mean(axis=0)
+    ptp_bound = np.ptp(vor.points, axis=0)
+
+    with span('segments'):
+        ridge_vertices = np.asarray(vor.ridge_vertices, dtype=np.intp).reshape(-1, 2)
+        finite = np.all(ridge_vertices >= 0, axis=1)
+        finite_segments = vor.vertices[ridge_vertices[finite]]
+        infinite_segments = infiniteRidges(vor, center, ptp_bound,
+                                           vor.ridge_points[~finite],
+                                           ridge_vertices[~finite],
+                                           vor.furthest_site)
+    count(npoints=len(vor.points), nridges=len(finite),
+          unbounded=len(infinite_segments))
+    return finite_segments, infinite_segments
+
+@traced
+@_held_figure
+def voronoi_raster_2d(vor, ax=None, **kw):
+    """
+    Plot the given Voronoi diagram in 2-D as a single image
+
+    The ridges are drawn straight into an array by rasterizeSegments
+    and the array is shown with one imshow, so the time taken depends
+    on the number of ridges and pixels and not on matplotlib.  Meant
+    for overviews of diagrams too big for voronoi_plot_2d.
+
+    Parameters
+    ----------
+    vor : scipy.spatial.Voronoi instance
+        Diagram to plot
+    ax : matplotlib.axes.Axes instance, optional
+        Axes to plot on
+    shape : (ny, nx) tuple, optional
+        Size of the image.  The default is the size of the axes in
+        pixels.
+    extent : (xmin, xmax, ymin, ymax) tuple, optional
+        Region to draw.  The default is the region voronoi_plot_2d
+        shows.  This is matplotlib's extent order (as for imshow),
+        not the (xmin, ymin, xmax, ymax) order of a clip box in
+        getVoronoiRegions.
+    coverage : bool, optional
+        If true, show which pixels any ridge crosses rather than how
+        many ridge samples fall in each pixel.
+    cmap : optional
+        Colormap for the image, 'gray_r' by default.
+    show_points: bool, optional
+        Add the Voronoi points to the plot.
+    point_size: float, optional
+        Specifies the size of points
+
+    Returns
+    -------
+    fig : matplotlib.figure.Figure instance
+        Figure for the plot
+
+    See Also
+    --------
+    voronoi_plot_2d, rasterizeSegments
+
+    Examples
+    --------
+
+    >>> vor = Voronoi(numpy.random.rand(1000000, 2))
+    >>> fig = voronoi_raster_2d(vor, show_points=False)
+
+    """
+    if vor.points.shape[1] != 2:
+        raise ValueError("Voronoi diagram is not 2-D")
+
+    extent = kw.get('extent', None)
+    if extent is None:
+        xy_min, xy_max = _bounds(np.vstack((vor.points, vor.vertices)))
+        extent = (xy_min[0], xy_max[0], xy_min[1], xy_max[1])
+
+    shape = kw.get('shape', None)
+    if shape is None:
+        shape = (max(1, int(ax.bbox.height)), max(1, int(ax.bbox.width)))
+
+    finite_segments, infinite_segments = _voronoiSegments(vor)
+    image = rasterizeSegments(finite_segments, extent, shape)
+    image += rasterizeSegments(infinite_segments, extent, shape)
+    if kw.get('coverage', False):
+        image = image > 0
+
+    ax.imshow(image, origin='lower', extent=extent, aspect='auto',
+              interpolation='nearest', cmap=kw.get('cmap', 'gray_r'))
+
+    if kw.get('show_points', True):
+        point_size = kw.get('point_size', None)
+        ax.plot(vor.points[:,0], vor.points[:,1], '.', markersize=point_size)
+
+    ax.set_xlim(extent[0], extent[1])
+    ax.set_ylim(extent[2], extent[3])
+
+    return ax.figure
+
+def _clipSegments(segments, extent):
+    """
+    Clip (n, 2, 2) segments to the rectangle extent, all at once
+    (Liang-Barsky).  Returns the start and end points of the parts
+    inside.
+    """
+    xmin, xmax, ymin, ymax = extent
+    start = segments[:,0]
+    delta = segments[:,1] - start
+    x, y   = start.T
+    dx, dy = delta.T
+
+    t0   = np.zeros(len(start))
+    t1   = np.ones(len(start))
+    keep = np.ones(len(start), dtype=bool)
+    for p, q in ((-dx, x - xmin), (dx, xmax - x), (-dy, y - ymin), (dy, ymax - y)):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            r = q/p
+        np.maximum(t0, np.where(p < 0, r, 0.0), out=t0)
+        np.minimum(t1, np.where(p > 0, r, 1.0), out=t1)
+        keep &= (p != 0) | (q >= 0)
+    keep &= t0 <= t1
+
+    start, delta = start[keep], delta[keep]
+    return start + t0[keep,None]*delta, start + t1[keep,None]*delta
+
+#  Segments, and samples, per chunk in rasterizeSegments, to bound its
+#  memory use.
+_RASTER_SEGMENTS = 1 << 18
+_RASTER_SAMPLES  = 1 << 22
+
+def rasterizeSegments(segments, extent, shape):
+    """
+    Draw line segments into a density image.
+
+    The segments are clipped to extent, then each is sampled about once
+    per pixel along its length and the samples are counted per pixel.
+    All of it is array operations, over chunks of segments and samples
+    so that the memory used stays small next to the image.
+
+    Parameters
+    ----------
+    segments : (n, 2, 2) array of segments.
+    extent : (xmin, xmax, ymin, ymax) of the image, in matplotlib's
+        extent order, not the (xmin, ymin, xmax, ymax) order of a clip
+        box in getVoronoiRegions.
+    shape : (ny, nx) size of the image in pixels.
+
+    Returns
+    -------
+    image : (ny, nx) int64 ndarray with the number of samples in each
+        pixel, row 0 at ymin (so show it with origin='lower').  Roughly
+        the length of ridge in each pixel, in pixels.
+
+    """
+    ny, nx = shape
+    xmin, xmax, ymin, ymax = extent
+    image = np.zeros(nx*ny, dtype=np.int64)
+
+    segments = np.asarray(segments, dtype=float).reshape(-1, 2, 2)
+    origin   = np.array([xmin, ymin])
+    scale    = np.array([nx/(xmax - xmin), ny/(ymax - ymin)])
+
+    nclipped = nsampled = 0
+    for first in range(0, len(segments), _RASTER_SEGMENTS):
+        start, end = _clipSegments(segments[first:first+_RASTER_SEGMENTS], extent)
+
+        # Pixel coordinates.
+        start = (start - origin)*scale
+        delta = (end - origin)*scale - start
+        nsamples = np.ceil(np.abs(delta).max(axis=1)).astype(np.intp) + 1
+        nclipped += len(nsamples)
+        nsampled += int(nsamples.sum())
+
+        ends   = np.cumsum(nsamples)
+        bounds = np.searchsorted(ends, np.arange(_RASTER_SAMPLES, nsamples.sum(), _RASTER_SAMPLES))
+        bounds = np.unique(np.concatenate(([0], bounds, [len(nsamples)])))
+        for lo, hi in zip(bounds[:-1], bounds[1:]):
+            n    = nsamples[lo:hi]
+            seg  = np.repeat(np.arange(lo, hi), n)
+            step = np.arange(len(seg)) - np.repeat(np.cumsum(n) - n, n)
+            t    = step/np.maximum(nsamples[seg] - 1, 1)
+            ix   = np.clip((start[seg,0] + t*delta[seg,0]).astype(np.intp), 0, nx - 1)
+            iy   = np.clip((start[seg,1] + t*delta[seg,1]).astype(np.intp), 0, ny - 1)
+            np.add.at(image, iy*nx + ix, 1)
+
+    count(nsegments=len(segments), nclipped=nclipped, nsamples=nsampled)
+    return image.reshape(ny, nx)
+
+class _RidgeIndex:
+    """
+    Lookup tables over the ridges of a planar Voronoi diagram.
+
+    The tables are built once, with a couple of sorts, so that finding
+    the unbounded ridges of a site, or the ridges that join a pair of
+    Voronoi vertices, does not require a scan of vor.ridge_vertices.
+    vor.regions is also kept here, flattened into a pair of arrays, so
+    that everything derived from the diagram is plain ndarrays.
+
+    Parameters
+    ----------
+    vor : scipy.spatial.Voronoi instance.
+
+    """
+
+    def __init__(self, vor):
+
+        from itertools import chain
+
+        # The vertices of region r are
+        # region_vertices[region_offsets[r]:region_offsets[r+1]].
+        lengths = np.fromiter(map(len, vor.regions), dtype=np.intp, count=len(vor.regions))
+        self.region_offsets  = np.zeros(len(lengths)+1, dtype=np.intp)
+        np.cumsum(lengths, out=self.region_offsets[1:])
+        self.region_vertices = np.fromiter(chain.from_iterable(vor.regions), dtype=np.intp,
+                                           count=self.region_offsets[-1])
+
+        self.ridge_points   = np.asarray(vor.ridge_points, dtype=np.intp)
+        self.ridge_vertices = np.asarray(vor.ridge_vertices, dtype=np.intp).reshape(-1, 2)
+
+        # vertex pair -> ridge.  The pair is unordered and the vertex
+        # numbers are shifted by one so that the point at infinity (-1)
+        # gets a key like any other vertex.
+        self.nkey = len(vor.vertices) + 1
+        keys  = self._pairKey(self.ridge_vertices[:,0], self.ridge_vertices[:,1])
+        order = np.argsort(keys, kind='stable')
+        self.pair_keys   = keys[order]
+        self.pair_ridges = order
+
+        # (site, vertex) -> unbounded ridge.  Each unbounded ridge is
+        # entered once for each of its two sites, keyed on the finite
+        # end of the ridge.
+        self.infinite = np.any(self.ridge_vertices < 0, axis=1)
+        ridges = np.nonzero(self.infinite)[0]
+        keys   = self._siteKey(self.ridge_points[ridges].ravel(),
+                               self.ridge_vertices[ridges].max(axis=1).repeat(2))
+        ridges = ridges.repeat(2)
+        order  = np.argsort(keys, kind='stable')
+        self.site_keys   = keys[order]
+        self.site_vertex_ridges = ridges[order]
+
+    @classmethod
+    def fromArrays(cls, nkey, arrays):
+        """Rebuild an index from nkey and the arrays returned by arrays()."""
+        index = cls.__new__(cls)
+        index.nkey = nkey
+        index.__dict__.update(arrays)
+        return index
+
+    def arrays(self):
+        """Dictionary of all of the ndarrays that make up the index."""
+        return {name: value for name, value in self.__dict__.items()
+                if isinstance(value, np.ndarray)}
+
+    def _siteKey(self, site, vertex):
+        return np.asarray(site, dtype=np.intp)*self.nkey + (np.asarray(vertex, dtype=np.intp)+1)
+
+    def _pairKey(self, v0, v1):
+        return (np.minimum(v0, v1)+1)*self.nkey + (np.maximum(v0, v1)+1)
+
+    def ridgesOfPair(self, v0, v1):
+        """Indices of all ridges that join Voronoi vertices v0 and v1."""
+        key = self._pairKey(v0, v1)
+        lo  = np.searchsorted(self.pair_keys, key, side='left')
+        hi  = np.searchsorted(self.pair_keys, key, side='right')
+        return self.pair_ridges[lo:hi]
+
+    def siteRidges(self, site, v0, v1):
+        """List of the ridges that join v0 and v1 and bound "site"."""
+        return [rdx for rdx in self.ridgesOfPair(v0, v1)
+                if site in self.ridge_points[rdx]]
+
+    def infiniteRidgesAt(self, sites, vertices):
+        """
+        Vectorized lookup of the unbounded ridges that bound sites[k]
+        and end at Voronoi vertex vertices[k].
+
+        Returns
+        -------
+        ridges : First matching ridge for each k.
+        count : Number of matching ridges for each k (normally 1).
+
+        """
+        keys = self._siteKey(sites, vertices)
+        lo = np.searchsorted(self.site_keys, keys, side='left')
+        hi = np.searchsorted(self.site_keys, keys, side='right')
+        ridges = self.site_vertex_ridges[np.minimum(lo, len(self.site_keys)-1)] \
+                 if len(self.site_keys) else np.zeros_like(lo)
+        return ridges, hi - lo
+
+def _regionsCSR(vor, index, center, ptp_bound, start, stop, close=False):
+    """
+    Assemble the Voronoi regions of sites start..stop-1 in compact form.
+
+    Regions are laid out one after the other in a single coordinate
+    array, in the same vertex order used by getVoronoiRegions, with the
+    vertex at infinity of an unbounded region replaced by the far points
+    of its unbounded ridges.  If close is true, one more point is put
+    between the far points, out along the bisector of the two ridges,
+    so that the polygon reaches at least 2*ptp_bound.max()/sqrt(2)
+    from the finite vertices however wide the angle between the ridges
+    (the chord between the far points alone passes close to the finite
+    vertices when the two ridges are nearly opposite).
+
+    Returns
+    -------
+    offsets : (stop-start+1,) ndarray.  The region of site start+i is
+        coords[offsets[i]:offsets[i+1]].
+    coords : (nvertices, 2) ndarray of region vertices.
+
+    """
+    nsites  = stop - start
+    # Sites with no region (point_region is -1, which happens for
+    # interior sites of a furthest site diagram) get an empty one.
+    regions = np.asarray(vor.point_region[start:stop], dtype=np.intp)
+    regions = np.where(regions >= 0, regions, len(index.region_offsets)-1)
+    lengths = index.region_offsets[np.minimum(regions+1, len(index.region_offsets)-1)] - \
+              index.region_offsets[regions]
+    starts  = np.zeros(nsites+1, dtype=np.intp)
+    np.cumsum(lengths, out=starts[1:])
+    owner   = np.repeat(np.arange(nsites), lengths)
+    flat    = index.region_vertices[np.arange(starts[-1]) +
+                                    np.repeat(index.region_offsets[regions] - starts[:-1], lengths)]
+
+    # The vertices either side of each vertex at infinity, and the
+    # unbounded ridges that end at them.
+    k    = np.nonzero(flat < 0)[0]
+    own  = owner[k]
+    pos  = k - starts[own]
+    last = flat[starts[own] + (pos-1) % lengths[own]]
+    next = flat[starts[own] + (pos+1) % lengths[own]]
+    rlast, nlast = index.infiniteRidgesAt(own+start, last)
+    rnext, nnext = index.infiniteRidgesAt(own+start, next)
+
+    # Normally there is exactly one unbounded ridge on either side of the
+    # vertex at infinity.  Anything else goes through the general lookup.
+    fast  = (nlast == 1) & (nnext == 1)
+    nridges = 1 + (rnext != rlast)
+    odd   = np.nonzero(~fast)[0]
+    odd_ridges = []
+    for j in odd:
+        site = own[j] + start
+        ridges = index.siteRidges(site, -1, last[j])
+        for rdx in index.siteRidges(site, -1, next[j]):
+            if not(rdx in ridges):
+                ridges.append(rdx)
+        odd_ridges.append(ridges)
+        nridges[j] = len(ridges)
+
+    emit_start = np.zeros(len(k)+1, dtype=np.intp)
+    np.cumsum(nridges, out=emit_start[1:])
+    emit = np.empty(emit_start[-1], dtype=np.intp)
+    emit[emit_start[:-1][fast]] = rlast[fast]
+    two = fast & (nridges == 2)
+    emit[emit_start[:-1][two]+1] = rnext[two]
+    for j, ridges in zip(odd, odd_ridges):
+        emit[emit_start[j]:emit_start[j+1]] = ridges
+
+    # Lay out the output.  Finite vertices take one slot, vertices at
+    # infinity one slot per unbounded ridge, plus one for the closing
+    # point, which goes just before the last far point.
+    extra   = (nridges >= 2) if close else np.zeros(len(k), dtype=bool)
+    out_len = np.ones(len(flat), dtype=np.intp)
+    out_len[k] = nridges + extra
+    out_pos = np.cumsum(out_len) - out_len
+
+    coords = np.empty((out_len.sum(), 2))
+    finite = np.ones(len(flat), dtype=bool)
+    finite[k] = False
+    coords[out_pos[finite]] = vor.vertices[flat[finite]]
+    if len(emit):
+        step   = np.arange(len(emit)) - np.repeat(emit_start[:-1], nridges)
+        target = np.repeat(out_pos[k], nridges) + step + \
+                 (np.repeat(extra, nridges) & (step == np.repeat(nridges, nridges) - 1))
+        far    = infiniteRidges(vor, center, ptp_bound,
+                                index.ridge_points[emit],
+                                index.ridge_vertices[emit],
+                                vor.furthest_site)[:,1]
+        coords[target] = far
+        if extra.any():
+            first = emit_start[:-1][extra]
+            last  = emit_start[1:][extra] - 1
+            chord = far[last] - far[first]
+            normal = np.stack((-chord[:,1], chord[:,0]), axis=1)
+            normal /= np.maximum(np.linalg.norm(normal, axis=1), np.finfo(float).tiny)[:,np.newaxis]
+            # Point the normal away from the finite part of the region.
+            midpoint = 0.5*(far[first] + far[last])
+            inside   = vor.vertices[index.ridge_vertices[emit[first]].max(axis=1)]
+            side     = np.where(np.einsum('ij,ij->i', midpoint - inside, normal) < 0, -1.0, 1.0)
+            coords[out_pos[k[extra]] + nridges[extra] - 1] = \
+                midpoint + side[:,np.newaxis]*normal*2*ptp_bound.max()
+
+    offsets = np.zeros(nsites+1, dtype=np.intp)
+    np.cumsum(np.bincount(owner, weights=out_len, minlength=nsites).astype(np.intp),
+              out=offsets[1:])
+
+    return offsets, coords
+
+@traced
+def getVoronoiRegions(vor, compact=False, clip=None, workers=None):
     """
 
     Get a list of polygons representing the Voronoi regions in a planar (2d) Voronoi diagram. 
@@ -283,11 +927,25 @@ def getVoronoiRegions(vor):
     Parameters
     ----------
     vor : scipy.spatial.Voronoi instance.
-    furthest_site: True for a furthest site diagram, false otherwise.
+    compact : If true, return the regions in compact (CSR) form rather
+        than as a list of arrays.
+    clip : Optional clip region, either a bounding box
+        (xmin, ymin, xmax, ymax) or an (n, 2) array with the vertices of
+        a convex polygon.  If given, every region is clipped to it and
+        unbounded regions come back as finite cells.  See clipRegions.
+        Note that the box order is not matplotlib's extent order
+        (xmin, xmax, ymin, ymax), which voronoi_raster_2d takes.
+    workers : Number of worker processes.  If more than one (or -1 for
+        one per CPU), the sites are split into chunks that are
+        processed in a process pool.  The diagram is handed to the
+        workers through shared memory rather than pickled.
 
     Returns
     -------
     voronoi_polygons: A set of polygons, each representing a Voronoi region.  
+        If compact is true, a pair (offsets, coords) instead, where the
+        region of site i is coords[offsets[i]:offsets[i+1]].  This
+        avoids one ndarray per site; see regionCollection for plotting.
 
     See Also
     --------
@@ -340,6 +998,12 @@ def getVoronoiRegions(vor):
     >>> region   = Polygon(polygons[0], alpha=0.2, color='lightgreen')
     >>> ax2.add_artist(region)
 
+    For large diagrams, get the regions in compact form and plot them
+    all at once.
+
+    >>> offsets, coords = getVoronoiRegions(vor, compact=True)
+    >>> ax2.add_collection(regionCollection(offsets, coords, alpha=0.2))
+
     Show both plots.
 
     >>> plt.show()
@@ -352,68 +1016,408 @@ def getVoronoiRegions(vor):
     furthest_site = vor.furthest_site
 
     center = vor.points.mean(axis=0)
-    ptp_bound = vor.points.ptp(axis=0)
+    ptp_bound = np.ptp(vor.points, axis=0)
+
+    with span('ridgeIndex'):
+        index = _RidgeIndex(vor)
+    count(npoints=len(vor.points), nridges=len(index.ridge_points),
+          unbounded=int(np.count_nonzero(index.infinite)), workers=workers or 1,
+          clipped=clip is not None)
+
+    if clip is not None:
+        clip = _clipPolygon(clip)
+        # Unbounded regions are closed off by their far points and a
+        # point along the bisector of their unbounded ridges (see
+        # _regionsCSR).  Push these well clear of the clip region so
+        # that the closing edges never cut into it.
+        ends  = index.ridge_vertices[index.infinite].max(axis=1)
+        reach = np.linalg.norm(clip - center, axis=1).max()
+        if len(ends):
+            reach += np.linalg.norm(vor.vertices[ends] - center, axis=1).max()
+        ptp_bound = np.maximum(ptp_bound, 5*reach)
+
+    with span('regions'):
+        if workers is None or workers == 1:
+            offsets, coords = _regionsChunk(vor, index, center, ptp_bound, clip,
+                                            0, len(vor.points))
+        else:
+            offsets, coords = _regionsParallel(vor, index, center, ptp_bound, clip, workers)
+    count(nvertices=len(coords))
+    if (compact):
+        return offsets, coords
 
     voronoi_polygons = []
-    #print('--------- getVoronoiRegions ------')
-    for pointidx in range(len(vor.points)):
-        point = vor.point_region[pointidx]
+    for start, stop in zip(offsets[:-1], offsets[1:]):
+        if (stop>start):
+            voronoi_polygons.append(coords[start:stop])
+        else:
+            voronoi_polygons.append(np.array([]))
+
+    return voronoi_polygons
+
+class VoronoiRegions:
+    """
+    Lazy, indexable collection of the Voronoi regions of a planar
+    (2d) Voronoi diagram.
+
+    The polygon for site i is built only when regions[i] is asked for,
+    in the same form getVoronoiRegions(vor)[i] would have, and the most
+    recently used polygons are cached.  Bounded regions cost a lookup
+    in vor.regions.  The first unbounded region asked for builds a small
+    table of the unbounded ridges, and after that unbounded regions are
+    a lookup as well.  Only the table depends on the number of sites,
+    and it takes a couple of vectorized passes over the points and
+    ridges (see _hullCandidates), so picking out a few regions of a
+    large diagram is cheap.
+
+    Parameters
+    ----------
+    vor : scipy.spatial.Voronoi instance.
+    maxsize : Maximum number of polygons to keep in the cache.
+
+    Examples
+    --------
+
+    >>> regions = VoronoiRegions(Voronoi(points))
+    >>> regions[0]                  # polygon of site 0
+    >>> regions[10:20]              # list of polygons of sites 10..19
+    >>> for polygon in regions:     # every polygon, in site order
+    ...     pass
+
+    Notes
+    -----
+    The cached polygons are shared, so they are returned read-only.
+
+    """
+
+    def __init__(self, vor, maxsize=1024):
+        from functools import lru_cache
+
+        if vor.points.shape[1] != 2:
+            raise ValueError("Voronoi diagram is not 2-D")
+
+        self.vor       = vor
+        self.center    = None  # set with the table of unbounded ridges
+        self.ptp_bound = np.asarray(vor.max_bound) - np.asarray(vor.min_bound)
+        self._infinite = None
+        self._cached   = lru_cache(maxsize=maxsize)(self._region)
+
+    def __len__(self):
+        return len(self.vor.points)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return [self._cached(i) for i in range(*key.indices(len(self)))]
+        site = operator.index(key)
+        if site < 0:
+            site += len(self)
+        if not (0 <= site < len(self)):
+            raise IndexError("site index out of range")
+        return self._cached(site)
+
+    def __iter__(self):
+        for site in range(len(self)):
+            yield self._cached(site)
+
+    def cache_info(self):
+        """Hit and miss counts of the polygon cache (see functools.lru_cache)."""
+        return self._cached.cache_info()
+
+    def _infiniteRidges(self, site, vertex):
+        """Unbounded ridges that bound "site" and end at "vertex"."""
+        if self._infinite is None:
+            # Unbounded ridges separate two hull sites, so only the
+            # ridges between two hull candidates need to be looked at.
+            vor = self.vor
+            candidate = np.zeros(len(vor.points), dtype=bool)
+            candidate[_hullCandidates(vor.points)] = True
+            ridge_points = np.asarray(vor.ridge_points)
+            self._infinite = {}
+            for rdx in np.nonzero(candidate[ridge_points[:,0]] & candidate[ridge_points[:,1]])[0]:
+                v0, v1 = vor.ridge_vertices[rdx]
+                if min(v0, v1) < 0:
+                    for point in ridge_points[rdx]:
+                        self._infinite.setdefault((point, max(v0, v1)), []).append(rdx)
+            self.center = vor.points.mean(axis=0)
+        return self._infinite.get((site, vertex), [])
+
+    def _region(self, site):
+        vor = self.vor
+        point = vor.point_region[site]
+        region = vor.regions[point] if point >= 0 else []
+
         this_polygon = []
-        region = vor.regions[point]
-        #print('region', region)
         for idx in range(len(region)):
             vertex = region[idx]
             if (vertex>=0):
                 this_polygon.append(vor.vertices[vertex])
-                #print('finite ridge', vertex)
             else:
-                ridge_points = []
                 last = (idx-1) % len(region)
                 next = (idx+1) % len(region)
-                ridgelast = np.array([vertex, region[last]])
-                rdx1 = [rdx for rdx in range(len(vor.ridge_vertices))
-                        if all(vor.ridge_vertices[rdx]==ridgelast)]
-                rdxlast = [rdx for rdx in rdx1 if any(vor.ridge_points[rdx]==pointidx)]
-                for rdx in rdxlast:
-                    if not(rdx in ridge_points):
-                        ridge_points.append(rdx)
-
-                ridgenext = np.array([vertex, region[next]])
-                rdx2 = [rdx for rdx in range(len(vor.ridge_vertices))
-                        if all(vor.ridge_vertices[rdx]==ridgenext)]
-                rdxnext = [rdx for rdx in rdx2 if any(vor.ridge_points[rdx]==pointidx)]
-                for rdx in rdxnext:
-                    if not(rdx in ridge_points):
-                        ridge_points.append(rdx)
-                #print('infinite ridge', ridgelast, rdx1, rdxlast)
-                #print('infinite ridge', ridgenext, rdx2, rdxnext)
-                #print('infinite ridge', ridge_points)
-                for ridgeidx in ridge_points:
-                    infinite_vertex = infiniteRidge(vor, center, ptp_bound,
-                                                    vor.ridge_points[ridgeidx],
-                                                    np.asarray(vor.ridge_vertices[ridgeidx]),
-                                                    furthest_site)[1]
-                    #print('infinite vertex', infinite_vertex)
-                    this_polygon.append(infinite_vertex)
-        
+                ridges = list(self._infiniteRidges(site, region[last]))
+                for rdx in self._infiniteRidges(site, region[next]):
+                    if not(rdx in ridges):
+                        ridges.append(rdx)
+                if ridges:
+                    this_polygon.extend(infiniteRidges(vor, self.center, self.ptp_bound,
+                                                       vor.ridge_points[ridges],
+                                                       [vor.ridge_vertices[rdx] for rdx in ridges],
+                                                       vor.furthest_site)[:,1])
+
         if (len(this_polygon)>0):
             this_polygon = np.vstack(this_polygon)
-        voronoi_polygons.append(np.array(this_polygon))
+        this_polygon = np.array(this_polygon)
+        this_polygon.flags.writeable = False
+        return this_polygon
 
-        #print('this_polygon\n', this_polygon)
+def _hullCandidates(points):
+    """
+    Indices of a superset of the points on the boundary of the convex
+    hull of a set of planar points.
 
-    #print('======\n', voronoi_polygons)
+    The points that are extreme in eight directions make an octagon
+    inside the hull, and the points strictly inside it are dropped
+    (the Akl-Toussaint heuristic).  For most point sets only a small
+    fraction of the points are left.
+    """
+    x, y = points[:,0], points[:,1]
+    along = [x, x+y, y, y-x]
+    # Counterclockwise around the hull: the maxima for directions 0,
+    # 45, 90 and 135 degrees, then the minima for 180 .. 315 degrees.
+    extremes = np.array([a.argmax() for a in along] + [a.argmin() for a in along])
+    extremes = extremes[extremes != np.roll(extremes, 1)]
+    if len(np.unique(extremes)) < 3:
+        return np.arange(len(points))
+
+    corners = points[extremes]
+    tol     = 1e-9*np.ptp(corners, axis=0).max()
+    inside  = np.ones(len(points), dtype=bool)
+    for a, b in zip(corners, np.roll(corners, -1, axis=0)):
+        edge = b - a
+        inside &= edge[0]*(y - a[1]) - edge[1]*(x - a[0]) > tol*np.hypot(*edge)
+    return np.nonzero(~inside)[0]
+
+def _regionsChunk(vor, index, center, ptp_bound, clip, start, stop):
+    """
+    Compact regions of sites start..stop-1, clipped if clip is not None.
+    """
+    offsets, coords = _regionsCSR(vor, index, center, ptp_bound, start, stop,
+                                  close=clip is not None)
+    if clip is not None:
+        offsets, coords = clipRegions(offsets, coords, clip)
+    return offsets, coords
 
-    return voronoi_polygons
+def _shareArrays(arrays):
+    """
+    Copy a dictionary of ndarrays into a single new shared memory block.
+
+    Returns
+    -------
+    shm : multiprocessing.shared_memory.SharedMemory instance.  The
+        caller is responsible for closing and unlinking it.
+    layout : Dictionary of (offset, shape, dtype) for each array, as
+        used by _sharedArray.
+
+    """
+    from multiprocessing import shared_memory
+
+    layout = {}
+    size   = 0
+    for name, value in arrays.items():
+        layout[name] = (size, value.shape, value.dtype.str)
+        size += -(-value.nbytes // 64) * 64  # keep every array aligned
+    shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+    for name, value in arrays.items():
+        _sharedArray(shm, layout[name])[...] = value
+    return shm, layout
+
+def _sharedArray(shm, spec):
+    offset, shape, dtype = spec
+    return np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=offset)
+
+# State of a region worker process, set up by _attachRegionWorker.
+_region_worker = {}
+
+def _attachRegionWorker(name, layout, nkey, furthest_site, center, ptp_bound, clip):
+    from multiprocessing import shared_memory
+    from types import SimpleNamespace
+
+    shm = shared_memory.SharedMemory(name=name)
+    arrays = {key: _sharedArray(shm, spec) for key, spec in layout.items()}
+    vor = SimpleNamespace(points=arrays.pop('points'),
+                          vertices=arrays.pop('vertices'),
+                          point_region=arrays.pop('point_region'),
+                          furthest_site=furthest_site)
+    _region_worker.update(shm=shm, vor=vor, index=_RidgeIndex.fromArrays(nkey, arrays),
+                          center=center, ptp_bound=ptp_bound, clip=clip)
+
+def _regionWorker(start, stop):
+    w = _region_worker
+    return _regionsChunk(w['vor'], w['index'], w['center'], w['ptp_bound'], w['clip'],
+                         start, stop)
+
+def _regionsParallel(vor, index, center, ptp_bound, clip, workers):
+    """
+    _regionsChunk over all sites, split across a pool of worker processes.
+
+    The diagram and the index are copied once into shared memory and
+    each worker maps them on start up, so a task is just a site range.
+    The compact results of the chunks are stitched together in site
+    order.
+    """
+    import os
+    from concurrent.futures import ProcessPoolExecutor
+
+    if workers < 0:
+        workers = os.cpu_count()
+    npoints = len(vor.points)
+
+    arrays = index.arrays()
+    arrays.update(points=np.asarray(vor.points, dtype=float),
+                  vertices=np.asarray(vor.vertices, dtype=float),
+                  point_region=np.asarray(vor.point_region, dtype=np.intp))
+
+    # A few chunks per worker so that the pool stays busy to the end.
+    bounds = np.unique(np.linspace(0, npoints, 4*workers+1).astype(np.intp))
+
+    shm, layout = _shareArrays(arrays)
+    try:
+        with ProcessPoolExecutor(workers, initializer=_attachRegionWorker,
+                                 initargs=(shm.name, layout, index.nkey, vor.furthest_site,
+                                           center, ptp_bound, clip)) as pool:
+            chunks = list(pool.map(_regionWorker, bounds[:-1], bounds[1:]))
+    finally:
+        shm.close()
+        shm.unlink()
+
+    offsets = [np.zeros(1, dtype=np.intp)]
+    shift   = 0
+    for chunk_offsets, chunk_coords in chunks:
+        offsets.append(chunk_offsets[1:] + shift)
+        shift += chunk_offsets[-1]
+    coords = np.concatenate([chunk_coords for _, chunk_coords in chunks] + [np.empty((0, 2))])
+
+    return np.concatenate(offsets), coords
+
+def _clipPolygon(clip):
+    """
+    Counterclockwise vertices of a clip region given either as a
+    bounding box (xmin, ymin, xmax, ymax) or as a convex polygon.
+    """
+    clip = np.asarray(clip, dtype=float)
+    if clip.shape == (4,):
+        xmin, ymin, xmax, ymax = clip
+        clip = np.array([[xmin, ymin], [xmax, ymin], [xmax, ymax], [xmin, ymax]])
+    if clip.ndim != 2 or clip.shape[1] != 2 or len(clip) < 3:
+        raise ValueError("clip must be a bounding box or a 2-D polygon")
+    x, y = clip.T
+    if np.dot(x, np.roll(y, -1)) - np.dot(np.roll(x, -1), y) < 0:
+        clip = clip[::-1]
+    return clip
+
+def _clipHalfPlane(offsets, coords, normal, offset):
+    """
+    One Sutherland-Hodgman pass: clip every region to normal.x <= offset.
+    """
+    nregions = len(offsets) - 1
+    lengths  = np.diff(offsets)
+    owner    = np.repeat(np.arange(nregions), lengths)
+
+    # Index of the next vertex around each region.
+    nxt = np.arange(1, len(coords)+1)
+    closed = lengths > 0
+    nxt[offsets[1:][closed]-1] = offsets[:-1][closed]
+
+    d = coords.dot(normal) - offset
+    inside = d <= 0
+    cross  = inside != inside[nxt]
+
+    # Each vertex emits itself if it is inside, followed by the
+    # intersection with the clip line if the edge to the next vertex
+    # crosses it.
+    emit = inside.astype(np.intp) + cross
+    pos  = np.cumsum(emit) - emit
+
+    clipped = np.empty((emit.sum(), 2))
+    clipped[pos[inside]] = coords[inside]
+    k = np.nonzero(cross)[0]
+    t = d[k] / (d[k] - d[nxt[k]])
+    clipped[pos[k]+inside[k]] = coords[k] + t[:,np.newaxis]*(coords[nxt[k]] - coords[k])
+
+    new_offsets = np.zeros(nregions+1, dtype=np.intp)
+    np.cumsum(np.bincount(owner, weights=emit, minlength=nregions).astype(np.intp),
+              out=new_offsets[1:])
+    return new_offsets, clipped
+
+def clipRegions(offsets, coords, clip):
+    """
+    Clip a set of convex polygons to a bounding box or convex polygon.
+
+    All of the polygons are clipped together, one edge of the clip
+    region at a time, so the cost is a handful of array operations per
+    clip edge regardless of the number of polygons.
+
+    Parameters
+    ----------
+    offsets, coords : Polygons in compact form, as returned by
+        getVoronoiRegions(vor, compact=True).
+    clip : Either a bounding box (xmin, ymin, xmax, ymax), which is
+        not matplotlib's extent order, or an (n, 2) array with the
+        vertices of a convex polygon, in either order.
 
+    Returns
+    -------
+    offsets, coords : The clipped polygons in compact form.  Polygons
+        entirely outside the clip region come back empty.
+
+    """
+    clip = _clipPolygon(clip)
+    offsets = np.asarray(offsets, dtype=np.intp)
+    coords  = np.asarray(coords, dtype=float)
+    for p, q in zip(clip, np.roll(clip, -1, axis=0)):
+        normal = np.array([q[1]-p[1], p[0]-q[0]])  # outward normal
+        offsets, coords = _clipHalfPlane(offsets, coords, normal, normal.dot(p))
+    return offsets, coords
+
+def regionCollection(offsets, coords, **kw):
+    """
+    Make a matplotlib PolyCollection from compact Voronoi regions.
+
+    Parameters
+    ----------
+    offsets, coords : Compact regions, as returned by
+        getVoronoiRegions(vor, compact=True).
+    kw : Passed on to matplotlib.collections.PolyCollection.
+
+    Returns
+    -------
+    collection : matplotlib.collections.PolyCollection instance.
+
+    Notes
+    -----
+    The polygons handed to matplotlib are views into coords, so no
+    region is copied.  Empty regions are dropped.
+
+    """
+    from matplotlib.collections import PolyCollection
+
+    offsets = np.asarray(offsets)
+    keep = np.nonzero(np.diff(offsets) > 0)[0]
+    return PolyCollection([coords[offsets[i]:offsets[i+1]] for i in keep], **kw)
+
+@traced
 def voronoi_plot_sphere(vor, ax=None, **kw):
     """
     Plot the given spherical Voronoi diagram
 
     Parameters
     ----------
-    vor : SphericalVoronoi instance
-        Diagram to plot
+    vor : SphericalVoronoi or Voronoi instance
+        Diagram to plot.  A 3-D Voronoi diagram is also accepted, as it
+        was before SphericalVoronoi existed, but only one arc per ridge
+        is drawn, between the first two vertices of the ridge polygon,
+        projected onto the unit sphere.  This is not the Voronoi diagram
+        on the sphere.
     ax : matplotlib.axes.Axes instance, optional
         Axes to plot on
     show_sphere: bool, optional
@@ -436,6 +1440,9 @@ def voronoi_plot_sphere(vor, ax=None, **kw):
         Size of vertex points
     vertex_color: string, optional
         Color of vertex points
+    arc_step: float, optional
+        Largest angle, in radians, between the samples of a ridge.
+        The default is one degree.
 
     Returns
     -------
@@ -448,7 +1455,8 @@ def voronoi_plot_sphere(vor, ax=None, **kw):
 
     Notes
     -----
-    Requires Matplotlib.
+    Requires Matplotlib.  The ridges are drawn as great circle arcs,
+    all in a single Line3DCollection.
 
     Examples
     --------
@@ -459,22 +1467,26 @@ def voronoi_plot_sphere(vor, ax=None, **kw):
     from numpy import pi, sin, cos
 
     import matplotlib.pyplot as plt
+    from mpl_toolkits.mplot3d.art3d import Line3DCollection
 
     if vor.points.shape[1] != 3:
         raise ValueError("Voronoi diagram is not 3-D")
 
-    furthest_site = vor.furthest_site
-
     if (ax is None):
         fig = plt.figure('Spherical Voronoi')
         ax  = fig.add_subplot(111, projection='3d')
 
+    # A SphericalVoronoi knows its sphere.  For a Voronoi diagram, the
+    # arcs are projected onto the unit sphere.
+    center = np.asarray(getattr(vor, 'center', np.zeros(3)), dtype=float)
+    radius = getattr(vor, 'radius', 1.0)
+
     if kw.get('show_sphere', True):
         u = np.linspace(0, 2*pi, 100)
         v = np.linspace(0, pi, 100)
-        x = np.outer(cos(u), sin(v))
-        y = np.outer(sin(u), sin(v))
-        z = np.outer(np.ones(np.size(u)), cos(v))
+        x = radius*np.outer(cos(u), sin(v)) + center[0]
+        y = radius*np.outer(sin(u), sin(v)) + center[1]
+        z = radius*np.outer(np.ones(np.size(u)), cos(v)) + center[2]
 
         ax.plot_surface(x, y, z, color='yellow', alpha=0.1)
 
@@ -486,12 +1498,22 @@ def voronoi_plot_sphere(vor, ax=None, **kw):
     line_width  = kw.get('line_width', 1.0)
     line_alpha  = kw.get('line_alpha', 0.4)
 
-    lmbda = np.linspace(0, 1, 1000)
-    for rv,cnt in zip(vor.ridge_vertices,range(len(vor.ridge_vertices))):
-        pts = vor.vertices[rv]
-        p = np.outer(lmbda,pts[0]) + np.outer((1-lmbda),pts[1])
-        p = p.T/np.linalg.norm(p,axis=1)
-        ax.plot(p[0], p[1], p[2], color=line_colors, alpha=line_alpha)
+    with span('arcs'):
+        ends  = vor.vertices[_sphereEdges(vor)] - center
+        norms = np.linalg.norm(ends, axis=2)
+        keep  = np.all(norms > 0, axis=1)
+        ends  = ends[keep]/norms[keep][:,:,None]
+        offsets, coords = _slerpArcs(ends[:,0], ends[:,1], kw.get('arc_step', pi/180))
+        coords = center + radius*coords
+    count(npoints=len(vor.points), nridges=len(ends), nsamples=len(coords))
+
+    if len(coords):
+        had_data = ax.has_data()
+        ax.add_collection3d(Line3DCollection(np.split(coords, offsets[1:-1]),
+                                             colors=line_colors,
+                                             linewidths=line_width,
+                                             alpha=line_alpha))
+        ax.auto_scale_xyz(coords[:,0], coords[:,1], coords[:,2], had_data=had_data)
 
     if kw.get('show_vertices', True):
         vertex_size = kw.get('vertex_size', 25.0)
@@ -501,3 +1523,62 @@ def voronoi_plot_sphere(vor, ax=None, **kw):
 
     return ax.figure
 
+def _sphereEdges(vor):
+    """
+    (n, 2) array with the vertex indices of the ridges of a spherical
+    Voronoi diagram.
+
+    For a Voronoi diagram, the first two vertices of each of its
+    ridge_vertices are taken, skipping those that run to infinity.
+    A SphericalVoronoi has no ridge_vertices, so its edges are the
+    sides of its regions, each side once.  Its regions are put in
+    cyclic order first (with sort_vertices_of_regions, which is
+    idempotent).
+    """
+    if hasattr(vor, 'ridge_vertices'):
+        edges = np.array([rv[:2] for rv in vor.ridge_vertices], dtype=np.intp).reshape(-1, 2)
+        return edges[np.all(edges >= 0, axis=1)]
+
+    vor.sort_vertices_of_regions()
+
+    lengths = np.fromiter(map(len, vor.regions), dtype=np.intp, count=len(vor.regions))
+    if lengths.sum() == 0:
+        return np.empty((0, 2), dtype=np.intp)
+    flat   = np.concatenate([np.asarray(region, dtype=np.intp) for region in vor.regions])
+    starts = np.repeat(np.cumsum(lengths) - lengths, lengths)
+    sizes  = np.repeat(lengths, lengths)
+    nxt    = starts + (np.arange(len(flat)) - starts + 1) % sizes
+    edges  = np.sort(np.column_stack((flat, flat[nxt])), axis=1)
+    return np.unique(edges, axis=0)
+
+def _slerpArcs(starts, ends, step):
+    """
+    Great circle arcs from the unit vectors starts[i] to ends[i].
+
+    Every arc is sampled evenly in angle, with just enough samples that
+    they are at most step radians apart, so short arcs are cheap and
+    long ones are still smooth.  All arcs are computed at once.
+
+    Returns
+    -------
+    offsets, coords : The arcs in the compact form of getVoronoiRegions;
+        arc i is coords[offsets[i]:offsets[i+1]].
+
+    """
+    theta    = np.arccos(np.clip(np.einsum('ij,ij->i', starts, ends), -1.0, 1.0))
+    nsamples = np.maximum(np.ceil(theta/step).astype(np.intp), 1) + 1
+    offsets  = np.concatenate(([0], np.cumsum(nsamples)))
+
+    arc   = np.repeat(np.arange(len(nsamples)), nsamples)
+    t     = (np.arange(offsets[-1]) - offsets[arc])/(nsamples[arc] - 1)
+    theta = theta[arc]
+    sine  = np.sin(theta)
+
+    # Straight interpolation where the ends (nearly) coincide.
+    small = sine < 1e-12
+    sine[small] = 1.0
+    wstart = np.where(small, 1 - t, np.sin((1 - t)*theta)/sine)
+    wend   = np.where(small, t, np.sin(t*theta)/sine)
+
+    coords = wstart[:,None]*starts[arc] + wend[:,None]*ends[arc]
+    return offsets, coords
@@ -0,0 +1,250 @@
+"""
+Memoized qhull computations.
+
+Computing the same ConvexHull, Delaunay triangulation or Voronoi
+diagram over and over for the same points is common (the scripts in
+this repository do it all the time).  A QhullCache keys each result on
+a hash of the point data and the qhull options, keeps recent results
+in memory and, optionally, stores them on disk as .npz files so that
+other processes and later runs can reuse them.
+
+Results loaded from disk are CachedQhull objects.  They have the same
+data attributes as the scipy.spatial object they stand for (points,
+simplices, good, equations, ridge_points, ridge_vertices, regions and
+so on), which is all that the plotting and region helpers in
+pybob.spatial.plotutils use, but none of the methods.
+
+"""
+#
+# Copyright (C)  Robert T. Short, 2019.
+#
+# Distributed under the same BSD license as Scipy.
+#
+
+import os
+import hashlib
+import zipfile
+from collections import OrderedDict
+
+import numpy
+
+from scipy.spatial import ConvexHull, Delaunay, Voronoi
+
+#  The attributes kept for each kind of result.
+_ATTRIBUTES = {
+    'ConvexHull': ['points', 'simplices', 'neighbors', 'equations', 'coplanar', 'good',
+                   'vertices', 'area', 'volume', 'ndim', 'npoints', 'nsimplex',
+                   'min_bound', 'max_bound'],
+    'Delaunay':   ['points', 'simplices', 'neighbors', 'equations', 'coplanar', 'good',
+                   'convex_hull', 'vertex_to_simplex', 'vertex_neighbor_vertices',
+                   'furthest_site', 'paraboloid_scale', 'paraboloid_shift',
+                   'ndim', 'npoints', 'nsimplex', 'min_bound', 'max_bound'],
+    'Voronoi':    ['points', 'vertices', 'ridge_points', 'ridge_vertices', 'regions',
+                   'point_region', 'furthest_site', 'ndim', 'npoints',
+                   'min_bound', 'max_bound'],
+}
+
+_CONSTRUCTORS = {'ConvexHull': ConvexHull, 'Delaunay': Delaunay, 'Voronoi': Voronoi}
+
+class CachedQhull:
+    """
+    The data attributes of a ConvexHull, Delaunay or Voronoi result,
+    as loaded from a QhullCache on disk.  "kind" is the name of the
+    scipy.spatial class it came from.
+    """
+
+    def __init__(self, kind, **attributes):
+        self.kind = kind
+        self.__dict__.update(attributes)
+
+    def __repr__(self):
+        return '<CachedQhull %s, %d points>' % (self.kind, len(self.points))
+
+def _flatten(name, value, arrays):
+    """Add the arrays that represent one attribute to "arrays"."""
+    if value is None:
+        return
+    if isinstance(value, list):
+        # Ragged lists of lists (Voronoi regions and, above 2-d, ridges).
+        lengths = numpy.fromiter(map(len, value), dtype=numpy.intp, count=len(value))
+        arrays[name+'__offsets'] = numpy.concatenate(([0], numpy.cumsum(lengths)))
+        arrays[name+'__values']  = numpy.fromiter((v for item in value for v in item),
+                                                  dtype=numpy.intp, count=lengths.sum())
+    elif isinstance(value, tuple):
+        for k, item in enumerate(value):
+            arrays['%s__%d' % (name, k)] = numpy.asarray(item)
+    else:
+        arrays[name] = numpy.asarray(value)
+
+def _unflatten(name, arrays):
+    """Rebuild one attribute from the arrays written by _flatten."""
+    if name+'__offsets' in arrays:
+        offsets, values = arrays[name+'__offsets'], arrays[name+'__values'].tolist()
+        return [values[a:b] for a, b in zip(offsets[:-1], offsets[1:])]
+    if name+'__0' in arrays:
+        return tuple(arrays['%s__%d' % (name, k)] for k in range(2))
+    if name not in arrays:
+        return None
+    value = arrays[name]
+    return value.item() if value.ndim == 0 else value
+
+class QhullCache:
+    """
+    Cache of ConvexHull, Delaunay and Voronoi results.
+
+    Parameters
+    ----------
+    maxsize : Number of results to keep in memory (least recently used
+        first out).
+    directory : Optional directory for a persistent .npz store.  It is
+        created if it doesn't exist.
+    maxbytes : Size limit of the store.  When it is exceeded the least
+        recently used files are removed.
+
+    Examples
+    --------
+
+    >>> cache = QhullCache(directory='/tmp/qhullcache')
+    >>> hull  = cache.convexHull(points, qhull_options='QG4')
+    >>> hull  = cache.convexHull(points, qhull_options='QG4')   # no qhull run
+
+    """
+
+    def __init__(self, maxsize=128, directory=None, maxbytes=1<<30):
+        self.maxsize   = maxsize
+        self.directory = directory
+        self.maxbytes  = maxbytes
+        self.hits      = 0
+        self.misses    = 0
+        self._memory   = OrderedDict()
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    def convexHull(self, points, qhull_options=None):
+        """Memoized scipy.spatial.ConvexHull(points, qhull_options=qhull_options)."""
+        return self.compute('ConvexHull', points, qhull_options=qhull_options)
+
+    def delaunay(self, points, furthest_site=False, qhull_options=None):
+        """Memoized scipy.spatial.Delaunay."""
+        return self.compute('Delaunay', points, furthest_site=furthest_site,
+                            qhull_options=qhull_options)
+
+    def voronoi(self, points, furthest_site=False, qhull_options=None):
+        """Memoized scipy.spatial.Voronoi."""
+        return self.compute('Voronoi', points, furthest_site=furthest_site,
+                            qhull_options=qhull_options)
+
+    @staticmethod
+    def key(kind, points, **options):
+        """
+        Hash of the kind of computation, the options and the point data.
+        """
+        points = numpy.ascontiguousarray(points, dtype=float)
+        digest = hashlib.blake2b(digest_size=20)
+        digest.update(repr((kind, points.shape, sorted(options.items()))).encode())
+        digest.update(points.data)
+        return digest.hexdigest()
+
+    def compute(self, kind, points, **options):
+        """
+        Result of scipy.spatial.<kind>(points, **options), from the cache
+        if it is there.
+        """
+        key = self.key(kind, points, **options)
+
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            self.hits += 1
+            return self._memory[key]
+
+        result = self._load(key)
+        if result is not None:
+            self.hits += 1
+        else:
+            self.misses += 1
+            result = _CONSTRUCTORS[kind](numpy.asarray(points, dtype=float), **options)
+            self._store(key, kind, result)
+
+        self._memory[key] = result
+        if len(self._memory) > self.maxsize:
+            self._memory.popitem(last=False)
+        return result
+
+    def clear(self):
+        """Empty the in-memory cache (the store on disk is left alone)."""
+        self._memory.clear()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + '.npz')
+
+    def _load(self, key):
+        if self.directory is None:
+            return None
+        path = self._path(key)
+        try:
+            with numpy.load(path, allow_pickle=False) as data:
+                arrays = dict(data.items())
+        except OSError:
+            return None
+        except (ValueError, EOFError, zipfile.BadZipFile):
+            self._discard(path)
+            return None
+        try:
+            kind   = str(arrays.pop('__kind__'))
+            result = CachedQhull(kind, **{name: _unflatten(name, arrays)
+                                          for name in _ATTRIBUTES[kind]})
+        except (KeyError, ValueError):
+            self._discard(path)
+            return None
+        try:
+            os.utime(path)  # mark as recently used
+        except OSError:
+            pass  # a read only store still serves hits
+        return result
+
+    def _discard(self, path):
+        """Remove a store entry that cannot be read, so that it is rebuilt."""
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def _store(self, key, kind, result):
+        if self.directory is None:
+            return
+        arrays = {'__kind__': numpy.array(kind)}
+        for name in _ATTRIBUTES[kind]:
+            _flatten(name, getattr(result, name), arrays)
+
+        path    = self._path(key)
+        partial = '%s.%d.tmp.npz' % (path[:-4], os.getpid())
+        try:
+            numpy.savez(partial, **arrays)
+            os.replace(partial, path)
+        except OSError:
+            try:
+                os.remove(partial)
+            except OSError:
+                pass
+            return
+        self._evict()
+
+    def _evict(self):
+        """Remove the least recently used files until the store fits in maxbytes."""
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith('.npz') and '.tmp.' not in entry.name:
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.maxbytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
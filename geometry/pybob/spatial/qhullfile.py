@@ -1,5 +1,5 @@
 """
-Utilities to read and write qhull files.
+Utilities to read and write qhull files, and to read qhull output.
 
 """
 #
@@ -8,52 +8,470 @@ Utilities to read and write qhull files.
 # Distributed under the same BSD license as Scipy.
 #
 
+import glob
+import os
+
 import numpy
 
-def readQhullFile(filename):
+from .tracing import traced, count
+
+#  Binary companion ("sidecar") files.  A sidecar is a small header
+#  followed by the points as raw little endian doubles, so it can be
+#  mapped straight into memory with numpy.memmap.  The header records
+#  the modification time and size of the text file it was made from,
+#  and the sidecar is only used while those still match.
+_SIDECAR_SUFFIX = '.qhb'
+_SIDECAR_MAGIC  = b'QHULLBIN'
+_SIDECAR_HEADER = numpy.dtype([('magic',    'S8'),
+                               ('ndim',     '<i8'),
+                               ('npoints',  '<i8'),
+                               ('mtime_ns', '<i8'),
+                               ('size',     '<i8')])
+_SIDECAR_OFFSET = 64  # header padded so that the data is aligned
+
+def sidecarFileName(filename):
+    """
+    Name of the binary companion file readQhullFile(filename, cache=True) uses.
+    """
+    return filename + _SIDECAR_SUFFIX
+
+def _readSidecar(filename):
+    """
+    Memory map the sidecar of filename, or return None if there isn't
+    a valid one.
+    """
+    sidecar = sidecarFileName(filename)
+    try:
+        stat   = os.stat(filename)
+        header = numpy.fromfile(sidecar, dtype=_SIDECAR_HEADER, count=1)
+        length = os.path.getsize(sidecar)
+    except OSError:
+        return None
+    if len(header) != 1:
+        return None
+    header = header[0]
+    ndim, npoints = int(header['ndim']), int(header['npoints'])
+    if (header['magic'] != _SIDECAR_MAGIC or
+        header['mtime_ns'] != stat.st_mtime_ns or header['size'] != stat.st_size or
+        length != _SIDECAR_OFFSET + 8*ndim*npoints):
+        return None
+    if npoints == 0:
+        return ndim, numpy.zeros((0, ndim))
+    return ndim, numpy.memmap(sidecar, dtype='<f8', mode='r',
+                              offset=_SIDECAR_OFFSET, shape=(npoints, ndim))
+
+def _writeSidecar(filename, points):
+    """
+    Write the sidecar of filename.  It is written to a temporary file
+    and renamed into place, so readers never see a partial one.  Failure
+    (e.g. a read only directory) is not an error, there just isn't a
+    sidecar.
+    """
+    npoints, ndim = points.shape
+    sidecar = sidecarFileName(filename)
+    partial = '%s.%d.tmp' % (sidecar, os.getpid())
+    try:
+        stat = os.stat(filename)
+        header = numpy.zeros(1, dtype=_SIDECAR_HEADER)
+        header[0] = (_SIDECAR_MAGIC, ndim, npoints, stat.st_mtime_ns, stat.st_size)
+        with open(partial, 'wb') as binfile:
+            binfile.write(header.tobytes().ljust(_SIDECAR_OFFSET, b'\0'))
+            binfile.write(numpy.ascontiguousarray(points, dtype='<f8').tobytes())
+        os.replace(partial, sidecar)
+    except OSError:
+        try:
+            os.remove(partial)
+        except OSError:
+            pass
+
+def _readHeader(hullfile):
+    """
+    Read the dimension and point count lines at the top of a qhull file.
+    """
+    try:
+        ndim    = int(hullfile.readline().split()[0])
+        npoints = int(hullfile.readline().split()[0])
+    except (IndexError, ValueError):
+        raise ValueError("%s: not a qhull point file" % hullfile.name)
+    if ndim < 1 or npoints < 0:
+        raise ValueError("%s: bad qhull header (%d, %d)" % (hullfile.name, ndim, npoints))
+    return ndim, npoints
+
+@traced
+def readQhullFile(filename, cache=False):
     """
     Read data from a qhull format file.
 
+    The header is read line by line, then the rest of the file is read
+    in one go and parsed in a single call to numpy.fromstring, so any
+    mix of spaces, tabs and line breaks between the coordinates is fine.
+
+    With cache=True the points are also saved in a binary companion
+    file next to the text file (see sidecarFileName).  Later reads map
+    that file with numpy.memmap instead of parsing the text again, for
+    as long as the text file's modification time and size are
+    unchanged.
+
     Parameters
     ----------
     filename : String with input file name.
+    cache : If true, read through (and if need be write) the binary
+        companion file.
     
     Returns
     -------
     ndim : Number of dimensions (e.g. 3 for a 3d data set).
-    points : ndarray of input points.
+    points : ndarray of input points.  A read only numpy.memmap if it
+        came from the binary companion file.
+
+    Raises
+    ------
+    ValueError : If the header is malformed, the body has something
+        other than numbers in it, or the number of coordinates does not
+        match the header.
 
     """
 
-    hullfile = open(filename)
-    ndim    = int(hullfile.readline())
-    npoints = int(hullfile.readline())
-    points = numpy.zeros((npoints,ndim))
-    for npt in range(npoints):
-        points[npt] = numpy.fromstring(hullfile.readline(), sep=' ')
+    if (cache):
+        cached = _readSidecar(filename)
+        if cached is not None:
+            count(ndim=cached[0], npoints=len(cached[1]), sidecar=True)
+            return cached
+
+    with open(filename, 'rb') as hullfile:
+        ndim, npoints = _readHeader(hullfile)
+        body = hullfile.read()
+
+    points = numpy.fromstring(body, dtype=float, sep=' ')
 
-    hullfile.close()
+    if points.size != ndim*npoints:
+        raise ValueError("%s: header says %d points in %d dimensions, found %d coordinates"
+                         % (filename, npoints, ndim, points.size))
+
+    points = points.reshape(npoints, ndim)
+    if (cache):
+        _writeSidecar(filename, points)
+    count(ndim=ndim, npoints=npoints, nbytes=len(body))
 
     return ndim, points
 
-def writeQhullFile(filename, points):
+def readQhullBlocks(filename, blocksize=65536):
+    """
+    Read a qhull format file a block of points at a time.
+
+    Only the header is read up front.  The points come from a generator
+    that opens the file again when it is started and reads and parses
+    it in pieces, so files much larger than memory can be processed
+    with bounded memory.
+
+    Parameters
+    ----------
+    filename : String with input file name.
+    blocksize : Number of points per block.  The last block may be
+        shorter.
+
+    Returns
+    -------
+    ndim : Number of dimensions (e.g. 3 for a 3d data set).
+    npoints : Number of points the header says the file holds.
+    blocks : Generator of (n, ndim) ndarrays of points, in file order.
+        It raises ValueError if the body does not match the header.
+
+    Examples
+    --------
+    Bounding box of a large file:
+
+    >>> ndim, npoints, blocks = readQhullBlocks('points')
+    >>> lo = numpy.full(ndim,  numpy.inf)
+    >>> hi = numpy.full(ndim, -numpy.inf)
+    >>> for block in blocks:
+    ...     lo = numpy.minimum(lo, block.min(axis=0))
+    ...     hi = numpy.maximum(hi, block.max(axis=0))
+
+    """
+    if blocksize < 1:
+        raise ValueError("blocksize must be at least 1")
+
+    with open(filename, 'rb') as hullfile:
+        ndim, npoints = _readHeader(hullfile)
+        start = hullfile.tell()
+
+    return ndim, npoints, _qhullBlocks(filename, start, ndim, npoints, blocksize)
+
+_READ_SIZE  = 1 << 20
+_WHITESPACE = b' \t\n\r\v\f'
+
+def _qhullBlocks(filename, start, ndim, npoints, blocksize):
+    # The file is opened again here, rather than kept open from the
+    # header read, so that a generator that is never started holds no
+    # file open.
+    expected = ndim*npoints
+    block    = blocksize*ndim
+    pending  = []
+    npending = 0
+    nread    = 0
+    tail     = b''
+
+    with open(filename, 'rb') as hullfile:
+        hullfile.seek(start)
+        while True:
+            chunk = hullfile.read(_READ_SIZE)
+            text  = tail + chunk
+            if chunk:
+                # Hold back a number that may be cut in two by the read.
+                cut  = max(text.rfind(c) for c in _WHITESPACE) + 1
+                tail = text[cut:]
+                text = text[:cut]
+            else:
+                tail = b''
+            if text.strip():
+                values = numpy.fromstring(text, dtype=float, sep=' ')
+                nread += values.size
+                if nread > expected:
+                    raise ValueError("%s: more than the %d points in the header"
+                                     % (hullfile.name, npoints))
+                pending.append(values)
+                npending += values.size
+
+            while npending >= block or (not chunk and npending > 0):
+                values  = numpy.concatenate(pending)
+                size    = min(block, npending) // ndim * ndim
+                if size == 0:
+                    break
+                yield values[:size].reshape(-1, ndim)
+                pending  = [values[size:]]
+                npending = values.size - size
+
+            if not chunk:
+                break
+
+    if nread != expected:
+        raise ValueError("%s: header says %d points in %d dimensions, found %d coordinates"
+                         % (hullfile.name, npoints, ndim, nread))
+
+_WRITE_ROWS = 65536
+
+@traced
+def writeQhullFile(filename, points, precision=None):
     """
     Write data to a qhull format file.
 
+    Rows are formatted a large chunk at a time, with one string format
+    operation per chunk, and written in a single call per chunk.
+
     Parameters
     ----------
     filename : String with input file name.
     points : ndarray of points.
+    precision : Number of significant digits to write.  The default,
+        None, writes the shortest representation that reads back to
+        exactly the same value (as repr does).
 
     """
-    hullfile = open(filename, 'w')
+    points = numpy.asarray(points)
     npoints, ndim = points.shape
-    
-    print(ndim, file=hullfile)
-    print(npoints, file=hullfile)
 
-    for row in points:
-        print(' '.join('%s' % p for p in row), file=hullfile)
+    if precision is None:
+        field = '%r'
+    else:
+        field = '%%.%dg' % int(precision)
+    row = ' '.join([field]*ndim) + '\n'
+    count(ndim=ndim, npoints=npoints)
+
+    with open(filename, 'w') as hullfile:
+        hullfile.write('%d\n%d\n' % (ndim, npoints))
+        for start in range(0, npoints, _WRITE_ROWS):
+            chunk = points[start:start+_WRITE_ROWS]
+            hullfile.write((row*len(chunk)) % tuple(chunk.ravel().tolist()))
+
+def qhullFileNames(sources):
+    """
+    File names from a list of directories, glob patterns and file names.
+
+    Directories and glob patterns contribute every regular file they
+    match other than python files and binary companion files, in sorted
+    order.  A pattern that matches nothing is taken as a file name, and
+    so is anything else.
+    """
+    def wanted(name):
+        return os.path.isfile(name) and not name.endswith(('.py', '.pyc', '.qhb'))
+
+    filenames = []
+    for source in sources:
+        if os.path.isdir(source):
+            names = sorted(os.path.join(source, name) for name in os.listdir(source))
+            filenames.extend(filter(wanted, names))
+        elif glob.has_magic(source):
+            names = sorted(glob.glob(source))
+            filenames.extend(filter(wanted, names) if names else [source])
+        else:
+            filenames.append(source)
+    return filenames
+
+#
+#  Readers for qhull output.  Each takes a file written by the qhull
+#  programs with the corresponding output option and returns it as
+#  arrays, without a Python loop over the lines.
+#
+
+def _readCounts(hullfile, nheader):
+    """
+    Read a header line of nheader integers.
+    """
+    try:
+        counts = [int(c) for c in hullfile.readline().split()[:nheader]]
+    except ValueError:
+        counts = []
+    if len(counts) != nheader:
+        raise ValueError("%s: bad qhull output header" % hullfile.name)
+    return counts
+
+def _lineTokens(body):
+    """
+    Parse a block of text with a variable number of numbers per line.
+
+    Returns
+    -------
+    values : 1-d ndarray of all of the numbers, in order.
+    counts : Number of values on each line, blank lines left out.
+
+    """
+    values = numpy.fromstring(body, dtype=float, sep=' ') if body.strip() else numpy.zeros(0)
+
+    # A token starts wherever a non-blank byte follows a blank one.
+    text  = numpy.frombuffer(body, dtype=numpy.uint8)
+    blank = numpy.isin(text, numpy.frombuffer(_WHITESPACE, dtype=numpy.uint8))
+    start = ~blank & numpy.concatenate(([True], blank[:-1]))
+    line  = numpy.cumsum(text == ord('\n')) - (text == ord('\n'))
+    counts = numpy.bincount(line[start], minlength=1) if len(text) else numpy.zeros(0, dtype=numpy.intp)
+    counts = counts[counts > 0]
+
+    if counts.sum() != values.size:
+        raise ValueError("qhull output has something other than numbers in it")
+    return values, counts
+
+def _toIndices(values):
+    indices = values.astype(numpy.intp)
+    if not numpy.array_equal(indices, values):
+        raise ValueError("qhull output has non-integer indices")
+    return indices
+
+def _compactOrArray(filename, counts, indices, compact):
+    offsets = numpy.zeros(len(counts)+1, dtype=numpy.intp)
+    numpy.cumsum(counts, out=offsets[1:])
+    if (compact):
+        return offsets, indices
+    if len(counts) and (counts != counts[0]).any():
+        raise ValueError("%s: facets have different numbers of vertices, use compact=True"
+                         % filename)
+    return indices.reshape(len(counts), counts[0] if len(counts) else 0)
+
+def readQhullIncidences(filename, compact=False):
+    """
+    Read the vertices of each facet, as written by qhull option 'i'.
+
+    Parameters
+    ----------
+    filename : String with input file name.
+    compact : If true, return the facets in compact form.  This is
+        needed for 3-d hulls with non-simplicial facets, which have
+        different numbers of vertices, unless qhull was run with 'Qt'.
+
+    Returns
+    -------
+    facets : (nfacets, nvertices) ndarray of input point indices, like
+        ConvexHull.simplices.  If compact is true, a pair
+        (offsets, vertices) instead, where the vertices of facet k are
+        vertices[offsets[k]:offsets[k+1]].
+
+    """
+    with open(filename, 'rb') as hullfile:
+        nfacets, = _readCounts(hullfile, 1)
+        values, counts = _lineTokens(hullfile.read())
+
+    if len(counts) != nfacets:
+        raise ValueError("%s: header says %d facets, found %d" % (filename, nfacets, len(counts)))
+
+    return _compactOrArray(filename, counts, _toIndices(values), compact)
 
-    hullfile.close()
+def readQhullOff(filename, compact=False):
+    """
+    Read the geometry written by qhull option 'o' (OFF format).
+
+    Parameters
+    ----------
+    filename : String with input file name.
+    compact : If true, return the facets in compact form (see
+        readQhullIncidences).
+
+    Returns
+    -------
+    points : (npoints, ndim) ndarray of point coordinates.  For
+        qvoronoi output these are the Voronoi vertices, and the first
+        one stands for the vertex at infinity.
+    facets : (nfacets, nvertices) ndarray of point indices, or a pair
+        (offsets, vertices) if compact is true.
+
+    """
+    with open(filename, 'rb') as hullfile:
+        ndim, = _readCounts(hullfile, 1)
+        npoints, nfacets = _readCounts(hullfile, 2)
+        values, counts = _lineTokens(hullfile.read())
+
+    # The points come first, one per line, then the facets.
+    if len(counts) != npoints+nfacets or (counts[:npoints] != ndim).any():
+        raise ValueError("%s: header says %d points in %d dimensions and %d facets"
+                         % (filename, npoints, ndim, nfacets))
+    points = values[:npoints*ndim]
+    values = values[npoints*ndim:]
+    counts = counts[npoints:]
+
+    # Each facet line is a vertex count followed by the vertices.
+    indices = _toIndices(values)
+    first   = numpy.cumsum(counts) - counts
+    if not numpy.array_equal(indices[first], counts-1):
+        raise ValueError("%s: facet vertex counts do not match the facets" % filename)
+    keep = numpy.ones(len(indices), dtype=bool)
+    keep[first] = False
+
+    return points.reshape(npoints, ndim), \
+           _compactOrArray(filename, counts-1, indices[keep], compact)
+
+def readQhullNormals(filename):
+    """
+    Read the facet hyperplanes written by qhull option 'n'.
+
+    Returns
+    -------
+    equations : (nfacets, ndim+1) ndarray.  Each row is the outward
+        unit normal of a facet followed by its offset, the same layout
+        as ConvexHull.equations.
+
+    """
+    with open(filename, 'rb') as hullfile:
+        ncolumns, = _readCounts(hullfile, 1)
+        nfacets,  = _readCounts(hullfile, 1)
+        values = numpy.fromstring(hullfile.read(), dtype=float, sep=' ')
+
+    if values.size != ncolumns*nfacets:
+        raise ValueError("%s: header says %d facets of %d values, found %d values"
+                         % (filename, nfacets, ncolumns, values.size))
+    return values.reshape(nfacets, ncolumns)
+
+def readQhullExtremes(filename):
+    """
+    Read the extreme points written by qhull option 'Fx'.
+
+    Returns
+    -------
+    vertices : 1-d ndarray of input point indices, like
+        ConvexHull.vertices.  In 2-d they are in counterclockwise order.
+
+    """
+    with open(filename, 'rb') as hullfile:
+        npoints, = _readCounts(hullfile, 1)
+        values = numpy.fromstring(hullfile.read(), dtype=float, sep=' ')
 
+    if values.size != npoints:
+        raise ValueError("%s: header says %d points, found %d" % (filename, npoints, values.size))
+    return _toIndices(values)
@@ -0,0 +1,162 @@
+"""
+Render many diagrams to image files, in parallel and without a display.
+
+Each worker process draws with the Agg canvas on a single figure and
+axes that it clears and reuses for every job, rather than creating
+and tearing down a figure per diagram as the plot functions in
+plotutils do when they are not given axes.  The diagrams themselves
+(hull, triangulation or Voronoi diagram) are computed in the
+workers, so only the points, or just a file name, are sent to them.
+
+A job is a dictionary with keys
+
+name : Output file name, without the extension.  It may include
+    subdirectories of the output directory, which are created as needed.
+kind : One of 'convex_hull', 'delaunay', 'voronoi' or 'voronoi_raster'.
+points : (npoints, 2) array of points, or
+filename : a qhull file to read them from.
+qhull_options : Optional, passed on to scipy.spatial.
+options : Optional dictionary of keyword arguments for the plot
+    function (for instance show_vertices=False).
+
+"""
+#
+# Copyright (C)  Robert T. Short, 2019.
+#
+# Distributed under the same BSD license as Scipy.
+#
+
+import json
+import os
+import time
+
+from .qhullfile import readQhullFile
+from .tracing import traced, count
+
+#  Plot functions and the scipy.spatial class each needs, by job kind.
+_KINDS = {
+    'convex_hull':    ('ConvexHull', 'convex_hull_plot_2d'),
+    'delaunay':       ('Delaunay',   'delaunay_plot_2d'),
+    'voronoi':        ('Voronoi',    'voronoi_plot_2d'),
+    'voronoi_raster': ('Voronoi',    'voronoi_raster_2d'),
+}
+
+# State of a render worker process, set up by _attachRenderWorker.
+_render_worker = {}
+
+def _attachRenderWorker(figsize, dpi, select_backend):
+    if select_backend:
+        import matplotlib
+        matplotlib.use('Agg')
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    figure = Figure(figsize=figsize, dpi=dpi)
+    FigureCanvasAgg(figure)
+    _render_worker.update(figure=figure, axes=figure.add_subplot(111))
+
+@traced
+def _renderJob(job, directory, fmt):
+    """
+    Draw one job on the worker's figure and save it.  Never raises, so
+    that one bad job does not stop a batch.
+    """
+    record = {'name': job['name'], 'kind': job.get('kind')}
+    try:
+        import scipy.spatial
+        from . import plotutils
+
+        start = time.perf_counter()
+        if 'points' in job:
+            points = job['points']
+        else:
+            ndim, points = readQhullFile(job['filename'])
+        constructor, plotter = _KINDS[job['kind']]
+        diagram = getattr(scipy.spatial, constructor)(points,
+                                                      qhull_options=job.get('qhull_options'))
+        built = time.perf_counter()
+
+        figure = _render_worker['figure']
+        axes   = _render_worker['axes']
+        axes.clear()
+        getattr(plotutils, plotter)(diagram, ax=axes, **job.get('options', {}))
+        filename = os.path.join(directory, '%s.%s' % (job['name'], fmt))
+        os.makedirs(os.path.dirname(filename), exist_ok=True)
+        figure.savefig(filename, format=fmt)
+        done = time.perf_counter()
+    except Exception as e:
+        record['error'] = '%s: %s' % (type(e).__name__, e)
+        return record
+
+    count(npoints=len(points))
+    record.update(file=filename, npoints=len(points),
+                  build_time=built-start, render_time=done-built)
+    return record
+
+def _renderJobs(jobs, directory, fmt):
+    return [_renderJob(job, directory, fmt) for job in jobs]
+
+def renderBatch(jobs, directory, fmt='png', workers=None, chunksize=8,
+                figsize=(6.4, 4.8), dpi=100, manifest='manifest.jsonl'):
+    """
+    Render a batch of diagrams to image files.
+
+    Parameters
+    ----------
+    jobs : Iterable of job dictionaries, see the module documentation.
+    directory : Directory for the images and the manifest.  Created if
+        need be.
+    fmt : Image format, 'png' or 'svg' (or anything else Agg's savefig
+        can write).
+    workers : Number of worker processes, -1 for one per CPU.  None or
+        1 (the default) renders in this process, still on a single
+        reused Agg figure.
+    chunksize : Number of jobs per task.
+    figsize, dpi : Size of the figure.
+    manifest : Name of the manifest file in directory, or None for no
+        manifest.
+
+    Returns
+    -------
+    records : One dictionary per job, in the order of jobs, with keys
+        name, kind, file, npoints, build_time and render_time
+        (seconds), or name, kind and error if the job failed.  These are
+        also the lines of the manifest, as JSON.
+
+    Examples
+    --------
+
+    >>> jobs = [{'name': 'hull%04d' % i, 'kind': 'convex_hull', 'points': points}
+    ...         for i, points in enumerate(snapshots)]
+    >>> records = renderBatch(jobs, 'report', workers=-1)
+
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    jobs = list(jobs)
+    os.makedirs(directory, exist_ok=True)
+    chunks = [jobs[start:start+chunksize] for start in range(0, len(jobs), chunksize)]
+
+    records = []
+    if workers is None or workers == 1:
+        _attachRenderWorker(figsize, dpi, False)
+        try:
+            for chunk in chunks:
+                records.extend(_renderJobs(chunk, directory, fmt))
+        finally:
+            _render_worker.clear()
+    else:
+        if workers < 0:
+            workers = os.cpu_count()
+        n = len(chunks)
+        with ProcessPoolExecutor(workers, initializer=_attachRenderWorker,
+                                 initargs=(figsize, dpi, True)) as pool:
+            for chunk_records in pool.map(_renderJobs, chunks, [directory]*n, [fmt]*n):
+                records.extend(chunk_records)
+
+    if manifest is not None:
+        with open(os.path.join(directory, manifest), 'w') as out:
+            for record in records:
+                out.write(json.dumps(record) + '\n')
+
+    return records
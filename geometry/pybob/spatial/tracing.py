@@ -0,0 +1,238 @@
+"""
+Opt-in timing spans for the slow stages of pybob.spatial.
+
+The file reading, hull, region and plotting functions are decorated
+with traced, and smaller stages are wrapped in span blocks.  A span
+records its name, the enclosing span, its start time, how long it
+took and a few counters (points, ridges and so on).  Spans are only
+recorded while tracing is on.  When it is off, span() hands
+back a shared do-nothing object, so an instrumented call costs a
+function call and a test of a list.  Counters are added to the
+innermost open span with count().
+
+Tracing is turned on either
+
+* for the whole process, by setting the environment variable
+  PYBOB_SPATIAL_TRACE to a file name (or '-' for standard error) that
+  the spans are appended to as JSON lines, or
+
+* for a block of code, with the tracing context manager, which passes
+  each span to a callback or writes it to a file.
+
+Examples
+--------
+
+>>> with tracing(records.append):
+...     ndim, points = readQhullFile('qhulldata/spheredata1')
+>>> records[0]['span'], records[0]['npoints']
+('readQhullFile', 4)
+
+From the command line::
+
+    > PYBOB_SPATIAL_TRACE=trace.jsonl python3 visible3d.py
+
+"""
+#
+# Copyright (C)  Robert T. Short, 2019.
+#
+# Distributed under the same BSD license as Scipy.
+#
+
+import contextlib
+import functools
+import json
+import os
+import sys
+import threading
+import time
+
+#  Callables that are passed the record of each finished span.  Tracing
+#  is on while this is not empty.
+_hooks = []
+
+#  The stack of open spans, per thread.
+_local = threading.local()
+
+class Span:
+    """
+    A timed stage, as returned by span() while tracing is on.
+
+    Counters can be given to span() or added with count() while the
+    span is open.  A Span is true and the disabled span is false, so
+    counters that take some work to compute can be skipped when
+    tracing is off::
+
+        with span('stage') as s:
+            ...
+            if s:
+                s.count(unbounded=numpy.count_nonzero(mask))
+
+    """
+
+    __slots__ = ('name', 'counters', 'parent', 'start', '_t0')
+
+    def __init__(self, name, counters):
+        self.name     = name
+        self.counters = counters
+
+    def count(self, **counters):
+        """Add (or replace) counters of this span."""
+        self.counters.update(counters)
+
+    def __enter__(self):
+        stack = getattr(_local, 'stack', None)
+        if stack is None:
+            stack = _local.stack = []
+        self.parent = stack[-1].name if stack else None
+        stack.append(self)
+        self.start = time.time()
+        self._t0   = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration = time.perf_counter() - self._t0
+        _local.stack.pop()
+        record = {'span': self.name, 'parent': self.parent, 'start': self.start,
+                  'duration': duration, 'pid': os.getpid()}
+        if exc_type is not None:
+            record['error'] = exc_type.__name__
+        record.update(self.counters)
+        for hook in list(_hooks):
+            hook(record)
+        return False
+
+class _NullSpan:
+    """The span handed out while tracing is off."""
+
+    __slots__ = ()
+
+    def count(self, **counters):
+        pass
+
+    def __bool__(self):
+        return False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+_NULL_SPAN = _NullSpan()
+
+def span(name, **counters):
+    """
+    A context manager that times the enclosed block as the span name.
+
+    Parameters
+    ----------
+    name : Name of the stage, usually the function it is in.
+    counters : Counters to record with the span.  Values must be
+        numbers, strings or anything else json can write (numpy
+        scalars are fine).
+
+    """
+    if not _hooks:
+        return _NULL_SPAN
+    return Span(name, counters)
+
+def traced(func):
+    """
+    Decorator that records each call of func as a span named after it.
+    """
+    name = func.__name__
+
+    @functools.wraps(func)
+    def wrapper(*args, **kw):
+        if not _hooks:
+            return func(*args, **kw)
+        with Span(name, {}):
+            return func(*args, **kw)
+    return wrapper
+
+def count(**counters):
+    """
+    Add counters to the innermost open span, if tracing is on.
+
+    Counters that take real work to compute should be guarded with
+    enabled().
+    """
+    if _hooks:
+        stack = getattr(_local, 'stack', None)
+        if stack:
+            stack[-1].counters.update(counters)
+
+def enabled():
+    """True if spans are being recorded."""
+    return bool(_hooks)
+
+def addHook(hook):
+    """Pass every span record, a dictionary, to hook from now on."""
+    _hooks.append(hook)
+
+def removeHook(hook):
+    """Stop passing span records to hook."""
+    _hooks.remove(hook)
+
+def _jsonDefault(value):
+    # numpy scalars and the like.
+    if hasattr(value, 'item'):
+        return value.item()
+    return str(value)
+
+def jsonLineWriter(stream):
+    """
+    A hook that writes each span record to stream as a line of JSON.
+    """
+    lock = threading.Lock()
+
+    def write(record):
+        line = json.dumps(record, default=_jsonDefault) + '\n'
+        with lock:
+            stream.write(line)
+            stream.flush()
+    return write
+
+@contextlib.contextmanager
+def tracing(hook=None, filename=None):
+    """
+    Record spans while in the with block.
+
+    Parameters
+    ----------
+    hook : Callable passed each span record.
+    filename : File the records are appended to as JSON lines.  If
+        neither hook nor filename is given, the records go to standard
+        error.
+
+    """
+    hooks  = []
+    stream = None
+    if hook is not None:
+        hooks.append(hook)
+    if filename is not None:
+        stream = open(filename, 'a')
+        hooks.append(jsonLineWriter(stream))
+    if not hooks:
+        hooks.append(jsonLineWriter(sys.stderr))
+
+    for h in hooks:
+        addHook(h)
+    try:
+        yield
+    finally:
+        for h in hooks:
+            removeHook(h)
+        if stream is not None:
+            stream.close()
+
+def _traceFromEnvironment():
+    target = os.environ.get('PYBOB_SPATIAL_TRACE')
+    if not target:
+        return
+    if target == '-':
+        addHook(jsonLineWriter(sys.stderr))
+    else:
+        addHook(jsonLineWriter(open(target, 'a')))
+
+_traceFromEnvironment()
@@ -0,0 +1,365 @@
+"""
+Utilities for facet visibility on convex hulls.
+
+A facet of a convex hull is visible from a point when the point is
+strictly outside the facet's hyperplane.  This is what qhull's 'QGn'
+option marks as good, but here the hull is computed once and the
+visibility for any number of viewpoints comes straight from
+hull.equations.
+
+"""
+#
+# Copyright (C)  Robert T. Short, 2019.
+#
+# Distributed under the same BSD license as Scipy.
+#
+
+import time
+
+import numpy
+
+from scipy.spatial import ConvexHull
+
+from .qhullfile import readQhullFile
+from .tracing import traced, span, count
+
+#  Largest number of (viewpoint, facet) distances to hold at once.
+_CHUNK_ELEMENTS = 1 << 22
+
+def facetDistances(hull, viewpoints):
+    """
+    Signed distances from viewpoints to the hyperplanes of the facets of a hull.
+
+    Parameters
+    ----------
+    hull : scipy.spatial.ConvexHull instance (or anything else with an
+        "equations" attribute in the same layout).
+    viewpoints : (m, ndim) array of viewpoints, or a single (ndim,) viewpoint.
+
+    Returns
+    -------
+    distances : (m, nfacets) ndarray, or (nfacets,) for a single
+        viewpoint.  Positive distances are outside the hull (the facet
+        is visible), negative inside.
+
+    """
+    equations  = numpy.asarray(hull.equations)
+    viewpoints = numpy.asarray(viewpoints, dtype=float)
+    if viewpoints.shape[-1] != equations.shape[1]-1:
+        raise ValueError("viewpoints are %d-D, hull is %d-D"
+                         % (viewpoints.shape[-1], equations.shape[1]-1))
+    return viewpoints.dot(equations[:,:-1].T) + equations[:,-1]
+
+@traced
+def classifyFacets(points, viewpoint, tol=0.0, qhull_options=None):
+    """
+    Split the facets of the convex hull of points into those visible and
+    those not visible from a viewpoint.
+
+    This takes a single hull computation, where doing the same with
+    qhull's 'QGn' and 'QG-n' options takes two.
+
+    Parameters
+    ----------
+    points : (npoints, ndim) array of points.  The viewpoint is not one
+        of them.
+    viewpoint : (ndim,) array.
+    tol : A facet is visible if the viewpoint is further than tol
+        outside its hyperplane.
+    qhull_options : Passed on to scipy.spatial.ConvexHull.
+
+    Returns
+    -------
+    hull : scipy.spatial.ConvexHull of points.
+    visible : Indices of the facets (rows of hull.simplices) visible
+        from the viewpoint.
+    invisible : Indices of the other facets.
+    distances : (nfacets,) ndarray of the signed distance from the
+        viewpoint to each facet's hyperplane.
+
+    """
+    with span('qhull'):
+        hull = ConvexHull(points, qhull_options=qhull_options)
+    distances = facetDistances(hull, viewpoint)
+    mask = distances > tol
+    count(npoints=len(points), nfacets=len(mask), nvisible=int(numpy.count_nonzero(mask)))
+    return hull, numpy.nonzero(mask)[0], numpy.nonzero(~mask)[0], distances
+
+@traced
+def visibleFacets(hull, viewpoints, tol=0.0, chunksize=None):
+    """
+    Which facets of a convex hull are visible from each of a set of viewpoints.
+
+    The viewpoints are processed in chunks, one matrix multiply per
+    chunk, so the memory used does not grow with the number of
+    viewpoints beyond the boolean result.
+
+    Parameters
+    ----------
+    hull : scipy.spatial.ConvexHull instance (or anything else with an
+        "equations" attribute in the same layout).
+    viewpoints : (m, ndim) array of viewpoints, or a single (ndim,) viewpoint.
+    tol : A facet is visible if the viewpoint is further than tol
+        outside its hyperplane.  The default, 0, matches qhull's 'QGn'.
+    chunksize : Number of viewpoints per chunk.  The default keeps each
+        chunk to a few million distances.
+
+    Returns
+    -------
+    visible : (m, nfacets) boolean ndarray, visible[i,j] true if facet
+        j (i.e. hull.simplices[j]) is visible from viewpoints[i].  A
+        (nfacets,) array for a single viewpoint.
+
+    Examples
+    --------
+
+    >>> hull = ConvexHull(points)
+    >>> visible = visibleFacets(hull, viewpoints)
+    >>> hull.simplices[visible[0]]      # facets visible from viewpoints[0]
+
+    """
+    equations  = numpy.asarray(hull.equations)
+    normals    = equations[:,:-1].T
+    offsets    = equations[:,-1]
+    viewpoints = numpy.asarray(viewpoints, dtype=float)
+
+    single = viewpoints.ndim == 1
+    viewpoints = numpy.atleast_2d(viewpoints)
+    if viewpoints.shape[1] != normals.shape[0]:
+        raise ValueError("viewpoints are %d-D, hull is %d-D"
+                         % (viewpoints.shape[1], normals.shape[0]))
+
+    if chunksize is None:
+        chunksize = max(1, _CHUNK_ELEMENTS // max(1, len(offsets)))
+
+    count(nviewpoints=len(viewpoints), nfacets=len(offsets), chunksize=chunksize)
+    visible = numpy.empty((len(viewpoints), len(offsets)), dtype=bool)
+    for start in range(0, len(viewpoints), chunksize):
+        chunk = viewpoints[start:start+chunksize]
+        numpy.greater(chunk.dot(normals) + offsets, tol, out=visible[start:start+chunksize])
+
+    return visible[0] if single else visible
+
+@traced
+def horizonRidges(hull, visible):
+    """
+    The horizon of a set of visible facets: the ridges shared by a
+    visible facet and a facet that is not visible.
+
+    Works in any dimension; a ridge is a point in 2-D, an edge in 3-D,
+    and so on.  Everything is done with array operations on
+    hull.neighbors, so it is cheap enough to call once per viewpoint.
+
+    Parameters
+    ----------
+    hull : scipy.spatial.ConvexHull instance.
+    visible : (nfacets,) boolean mask of the visible facets, as from
+        visibleFacets, or an array of their indices.
+
+    Returns
+    -------
+    ridges : (n, ndim-1) array of the indices into hull.points of the
+        vertices of each horizon ridge.
+    coords : (n, ndim-1, ndim) array of the vertex coordinates.
+    facets : (n, 2) array, the visible facet and the invisible facet
+        that meet at each ridge.
+
+    Examples
+    --------
+
+    >>> hull = ConvexHull(points)
+    >>> ridges, coords, facets = horizonRidges(hull, visibleFacets(hull, viewpoint))
+
+    """
+    simplices = numpy.asarray(hull.simplices)
+    neighbors = numpy.asarray(hull.neighbors)
+    nfacets, ndim = simplices.shape
+
+    mask = numpy.zeros(nfacets, dtype=bool)
+    mask[visible] = True
+
+    # neighbors[i,k] is the facet across the ridge opposite vertex k of
+    # facet i, so the ridge is facet i without its k'th vertex.
+    rows, cols = numpy.nonzero(mask[:,None] & ~mask[neighbors])
+    keep = numpy.ones((len(rows), ndim), dtype=bool)
+    keep[numpy.arange(len(rows)), cols] = False
+    ridges = simplices[rows][keep].reshape(len(rows), ndim-1)
+
+    count(nfacets=nfacets, nridges=len(rows))
+    facets = numpy.column_stack((rows, neighbors[rows, cols]))
+    return ridges, numpy.asarray(hull.points)[ridges], facets
+
+@traced
+def _classifyFile(filename, viewpoint, tol, qhull_options):
+    """
+    Read one qhull file and classify its facets.  Never raises, so that
+    one bad file does not stop a batch.
+    """
+    summary = {'filename': filename}
+    try:
+        start = time.perf_counter()
+        ndim, points = readQhullFile(filename)
+        read = time.perf_counter()
+        if viewpoint is None:
+            vp = numpy.zeros(ndim)
+        else:
+            vp = viewpoint
+        hull, visible, invisible, distances = classifyFacets(points, vp, tol, qhull_options)
+        done = time.perf_counter()
+    except Exception as e:
+        summary['error'] = '%s: %s' % (type(e).__name__, e)
+        return summary
+
+    summary.update(ndim=int(ndim), npoints=len(points), nfacets=len(hull.simplices),
+                   nvisible=len(visible), visible=visible.tolist(),
+                   read_time=read-start, hull_time=done-read)
+    return summary
+
+def _classifyFiles(filenames, viewpoint, tol, qhull_options):
+    return [_classifyFile(filename, viewpoint, tol, qhull_options) for filename in filenames]
+
+def batchVisibility(filenames, viewpoint=None, tol=0.0, qhull_options=None,
+                    workers=None, chunksize=16):
+    """
+    Classify the facets of many qhull files, in a pool of worker processes.
+
+    Each worker reads and classifies whole chunks of files, so the cost
+    of starting an interpreter and importing scipy is paid once per
+    worker rather than once per file, and only the summaries come back.
+
+    Parameters
+    ----------
+    filenames : Iterable of qhull point file names.
+    viewpoint : (ndim,) array, or None (the default) for the origin of
+        each file's space.
+    tol, qhull_options : As for classifyFacets.
+    workers : Number of worker processes, -1 for one per CPU.  None or
+        1 (the default) classifies the files in this process.
+    chunksize : Number of files per task.
+
+    Returns
+    -------
+    summaries : Iterator over one dictionary per file, in the order of
+        filenames, with keys filename, ndim, npoints, nfacets, nvisible,
+        visible (list of the visible facet indices), read_time and
+        hull_time (seconds).  If the file could not be read or hulled
+        the dictionary instead has filename and error.
+
+    Examples
+    --------
+
+    >>> for summary in batchVisibility(glob.glob('qhulldata/*'), workers=-1):
+    ...     print(summary['filename'], summary.get('nvisible'))
+
+    """
+    import os
+    from concurrent.futures import ProcessPoolExecutor
+
+    filenames = list(filenames)
+    if viewpoint is not None:
+        viewpoint = numpy.asarray(viewpoint, dtype=float)
+    chunks = [filenames[start:start+chunksize] for start in range(0, len(filenames), chunksize)]
+
+    if workers is None or workers == 1:
+        for chunk in chunks:
+            yield from _classifyFiles(chunk, viewpoint, tol, qhull_options)
+        return
+
+    if workers < 0:
+        workers = os.cpu_count()
+    n = len(chunks)
+    with ProcessPoolExecutor(workers) as pool:
+        for summaries in pool.map(_classifyFiles, chunks, [viewpoint]*n, [tol]*n,
+                                  [qhull_options]*n):
+            yield from summaries
+
+def _facetKeys(simplices):
+    """
+    One hashable, sortable key per facet, independent of the order of
+    its vertices and of where it sits in hull.simplices.
+    """
+    rows = numpy.ascontiguousarray(numpy.sort(simplices, axis=1))
+    return rows.view(numpy.dtype((numpy.void, rows.dtype.itemsize*rows.shape[1]))).ravel()
+
+class VisibilityTracker:
+    """
+    Keep the convex hull of a growing point set, and the set of its
+    facets visible from a fixed viewpoint, up to date as points arrive.
+
+    The hull is built with qhull's incremental mode, so each batch of
+    points is added to the existing hull rather than the hull being
+    rebuilt.  A facet's visibility never changes while it is on the
+    hull, so after each batch only new facets are checked against the
+    viewpoint, and the facets whose visibility changed are those that
+    appeared or disappeared.
+
+    Parameters
+    ----------
+    points : (npoints, ndim) array with the initial points.
+    viewpoint : (ndim,) array.
+    tol : A facet is visible if the viewpoint is further than tol
+        outside its hyperplane.
+    qhull_options : Passed on to scipy.spatial.ConvexHull.
+
+    Attributes
+    ----------
+    hull : The scipy.spatial.ConvexHull, in incremental mode.
+    visible : Boolean mask over hull.simplices of the visible facets.
+
+    Examples
+    --------
+
+    >>> tracker = VisibilityTracker(points, numpy.zeros(3))
+    >>> for batch in batches:
+    ...     appeared, disappeared = tracker.addPoints(batch)
+
+    """
+
+    def __init__(self, points, viewpoint, tol=0.0, qhull_options=None):
+        self.viewpoint = numpy.asarray(viewpoint, dtype=float)
+        self.tol       = tol
+        self.hull      = ConvexHull(points, incremental=True, qhull_options=qhull_options)
+        self._keys     = _facetKeys(self.hull.simplices)
+        self.visible   = facetDistances(self.hull, self.viewpoint) > tol
+
+    @traced
+    def addPoints(self, points):
+        """
+        Add a batch of points to the hull.
+
+        Returns
+        -------
+        appeared : Indices into the new hull.simplices of the visible
+            facets that were not on the hull before.
+        disappeared : (n, ndim) array with the vertex indices of the
+            visible facets that are no longer on the hull.
+
+        """
+        old_keys    = self._keys
+        old_visible = self.visible
+
+        with span('qhull'):
+            self.hull.add_points(points)
+        keys = _facetKeys(self.hull.simplices)
+
+        # Facets that survive keep their visibility.  Only new ones need
+        # their distance to the viewpoint.
+        new = ~numpy.isin(keys, old_keys)
+        visible = numpy.zeros(len(keys), dtype=bool)
+        visible[~new] = numpy.isin(keys[~new], old_keys[old_visible])
+        visible[new]  = numpy.asarray(self.hull.equations)[new].dot(
+                            numpy.append(self.viewpoint, 1.0)) > self.tol
+
+        gone = old_visible & ~numpy.isin(old_keys, keys)
+        disappeared = numpy.frombuffer(old_keys[gone].tobytes(), dtype=self.hull.simplices.dtype)
+
+        self._keys   = keys
+        self.visible = visible
+        count(npoints=len(points), nfacets=len(keys), appeared=int(numpy.count_nonzero(visible & new)),
+              disappeared=len(disappeared)//self.hull.ndim)
+
+        return numpy.nonzero(visible & new)[0], disappeared.reshape(-1, self.hull.ndim)
+
+    def close(self):
+        """Finish incremental processing (see ConvexHull.close)."""
+        self.hull.close()
@@ -0,0 +1,73 @@
+"""
+renderbatch - Draw the diagrams of many qhull files.
+=====================================================
+Python script to draw the convex hull, Delaunay triangulation or
+Voronoi diagram of each of a batch of 2-d qhull files to an image file.
+
+The files are given as directories, glob patterns or file names.  They
+are drawn without a display, in a pool of worker processes that each
+reuse a single figure, and written to the output directory as
+<file name>.png (or .svg) along with a manifest, manifest.jsonl, with
+one line of JSON per file.  Files from different directories keep
+their path below the directory common to all of them, so a/points and
+b/points are drawn to a/points.png and b/points.png.
+
+Example
+-------
+From the command line::
+
+    > python3 renderbatch.py qhulldata/visible1 qhulldata/visible2
+    > python3 renderbatch.py 'qhulldata/visible*' --kind voronoi --format svg --output renders
+
+"""
+#
+# Copyright (C)  Robert T. Short, 2019.
+#
+# Distributed under the same BSD license as Scipy.
+#
+import argparse
+import os
+import sys
+import time
+
+from pybob.spatial.qhullfile import qhullFileNames
+from pybob.spatial.rendering import renderBatch
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description='Draw the diagrams of many 2-d qhull files '
+                                     'to image files.')
+    parser.add_argument('sources', nargs='+',
+                        help='directories, glob patterns or qhull files')
+    parser.add_argument('--kind', default='convex_hull',
+                        choices=['convex_hull', 'delaunay', 'voronoi', 'voronoi_raster'],
+                        help='diagram to draw (default %(default)s)')
+    parser.add_argument('--format', default='png', choices=['png', 'svg'],
+                        help='image format (default %(default)s)')
+    parser.add_argument('--output', '-o', default='renders',
+                        help='output directory (default %(default)s)')
+    parser.add_argument('--workers', type=int, default=-1,
+                        help='number of worker processes, -1 for one per CPU (default %(default)s)')
+    parser.add_argument('--dpi', type=int, default=100,
+                        help='image resolution (default %(default)s)')
+    args = parser.parse_args()
+
+    # Name the images by their path below the directory common to all of
+    # the files, so that files with the same name in different
+    # directories do not overwrite each other's images.
+    filenames = qhullFileNames(args.sources)
+    if filenames:
+        common = os.path.commonpath([os.path.dirname(os.path.abspath(filename))
+                                     for filename in filenames])
+    jobs = [{'name': os.path.relpath(os.path.abspath(filename), common),
+             'kind': args.kind, 'filename': filename}
+            for filename in filenames]
+
+    start   = time.perf_counter()
+    records = renderBatch(jobs, args.output, fmt=args.format, workers=args.workers, dpi=args.dpi)
+    failed  = [record for record in records if 'error' in record]
+    for record in failed:
+        print('%s: %s' % (record['name'], record['error']), file=sys.stderr)
+
+    print('%d files, %d failed, %.3f s' % (len(records), len(failed), time.perf_counter()-start),
+          file=sys.stderr)
@@ -40,6 +40,14 @@ hull and print the simplex and sites corresponding the the simplex on
 the standard output.  See the documentation for
 scipy.spatial.ConvexHull for details).
 
+The highlights are blitted over a cached image of the hull, so
+stepping through the facets stays quick even for hulls with tens of
+thousands of facets.
+
+Set the environment variable PYBOB_SPATIAL_TRACE to a file name (or
+'-' for standard error) to get the time taken by reading, qhull and
+plotting as JSON lines (see pybob.spatial.tracing).
+
 """
 #
 # Copyright (C)  Robert T. Short, 2019.
@@ -56,6 +64,7 @@ from scipy.spatial import ConvexHull, Delaunay
 from pybob.spatial.plotutils import convex_hull_plot_2d
 
 from pybob.spatial.qhullfile import readQhullFile
+from pybob.spatial.tracing import span
 
 import matplotlib.pyplot as plt
 from matplotlib.collections import LineCollection
@@ -69,15 +78,13 @@ class Plots:
         self.point   = 0
         self.simplex = 0
 
-        self.lines   = []
-        self.scatter = []
-
         self.fig1 = plt.figure('Convex Hull')
         self.ax1  = self.fig1.add_subplot(111)
         self.fig1.canvas.mpl_connect('key_press_event', self.press)
+        self.fig1.canvas.mpl_connect('draw_event', self.onDraw)
         
         self.ax1.scatter(hull.points[0:-1,0], hull.points[0:-1:,1], marker='o', color='green')
-        line_segments = [hull.points[simplex] for simplex in hull.simplices]
+        line_segments = hull.points[hull.simplices]
         self.ax1.add_collection(LineCollection(line_segments,
                                                colors='k',
                                                linestyle='solid',
@@ -89,19 +96,43 @@ class Plots:
         self.ax1.set_xlim([mn,mx])
         self.ax1.set_ylim([mn,mx])
 
+        #  The highlights are created once, hidden, and moved about by
+        #  press.  They are animated, so they are left out of the full
+        #  redraws and are blitted over the cached background instead.
+        self.site      = self.ax1.scatter([], [], color='red', marker='.', animated=True)
+        self.endpoints = self.ax1.scatter([], [], color='red', animated=True)
+        self.facet,    = self.ax1.plot([], [], animated=True)
+        self.highlights = [self.site, self.endpoints, self.facet]
+        for artist in self.highlights:
+            artist.set_visible(False)
+        self.background = None
+
         self.ax1.set_aspect('equal')
         self.fig1.show()
 
+    def onDraw(self, event):
+        #  A full redraw (the first one, or after a zoom, pan or resize).
+        #  Keep the new background and put the highlights back on it.
+        canvas = self.fig1.canvas
+        if getattr(canvas, 'supports_blit', False):
+            self.background = canvas.copy_from_bbox(self.fig1.bbox)
+        for artist in self.highlights:
+            self.ax1.draw_artist(artist)
+
+    def blit(self):
+        canvas = self.fig1.canvas
+        if self.background is None:
+            canvas.draw_idle()
+            return
+        canvas.restore_region(self.background)
+        for artist in self.highlights:
+            self.ax1.draw_artist(artist)
+        canvas.blit(self.fig1.bbox)
+        canvas.flush_events()
 
     def clearGraphics(self):
-        for line in self.scatter:
-            line.remove()
-        for line in self.lines:
-            for ln in line:
-                ln.remove()
-        self.lines   = []
-        self.scatter = []
-        self.fig1.canvas.draw()
+        for artist in self.highlights:
+            artist.set_visible(False)
         
     def press(self, event):
 
@@ -111,13 +142,13 @@ class Plots:
         # Cycle through the generator points.
         if (event.key=='c'):
             self.clearGraphics()
+            self.blit()
         if (event.key=='n'):
             self.clearGraphics()
             print('Input site', self.point, self.hull.points[self.point])
-            self.scatter.append(self.ax1.scatter(self.hull.points[self.point,0],
-                                                 self.hull.points[self.point,1],
-                                                 color='red', marker='.'                    ))
-            self.fig1.canvas.draw()
+            self.site.set_offsets(self.hull.points[self.point:self.point+1])
+            self.site.set_visible(True)
+            self.blit()
             self.point = numpy.mod(self.point+1, len(self.hull.points))
         # Cycle through the hull simplices
         if (event.key=='left'):
@@ -129,9 +160,12 @@ class Plots:
                 color='green'
             else:
                 color='red'
-            self.scatter.append(self.ax1.scatter(simplex[:,0],simplex[:,1],color='red'))
-            self.lines.append(self.ax1.plot(simplex[:,0],simplex[:,1],color=color))
-            self.fig1.canvas.draw()
+            self.endpoints.set_offsets(simplex)
+            self.facet.set_data(simplex[:,0], simplex[:,1])
+            self.facet.set_color(color)
+            self.endpoints.set_visible(True)
+            self.facet.set_visible(True)
+            self.blit()
             self.simplex = numpy.mod(self.simplex+1, len(self.hull.simplices))
 
 if __name__ == "__main__":
@@ -173,10 +207,12 @@ if __name__ == "__main__":
     vpoint  = numpy.array([0.0,0.0])
     epoints = numpy.vstack((points,vpoint))
     
-    hull  = ConvexHull(points)
+    with span('qhull', npoints=npoints):
+        hull  = ConvexHull(points)
     qhull_options = 'QG'+str(npoints)
     print('qhull_options: ', qhull_options)
-    ehull = ConvexHull(epoints, qhull_options=qhull_options)
+    with span('qhull', npoints=npoints+1, qhull_options=qhull_options):
+        ehull = ConvexHull(epoints, qhull_options=qhull_options)
 
     print('points\n', points)
     print('simplices\n',  hull.simplices)
@@ -185,7 +221,8 @@ if __name__ == "__main__":
     print('esimplices\n', ehull.simplices)
     print('good\n',    ehull.good)
 
-    plots = Plots(ehull)
+    with span('Plots', nfacets=len(ehull.simplices)):
+        plots = Plots(ehull)
 
     print()
     print('With focus in Convex Hull window')
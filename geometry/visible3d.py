@@ -3,54 +3,76 @@ visible3d - Demonstrate visible facets in n-space.
 ==================================================
 Python script to demonstrate visible facets in Euclidean n-space.
 
-Data is generated by reading a qhull file.  Edit the source to pick a different file.
+Data is generated by reading a qhull file, by default
+qhulldata/spheredata1.  The viewpoint is the origin unless another
+one is given.  The convex hull is computed once, and the facets are
+split into those that are and are not visible from the viewpoint.
 
 This program displays no graphics, it just prints the result of the
 scipy.spatial ConvexHull routine.
 
+Set the environment variable PYBOB_SPATIAL_TRACE to a file name (or
+'-' for standard error) to get the time taken by reading and by qhull
+as JSON lines (see pybob.spatial.tracing).
+
+Example
+-------
+From the command line::
+
+    > python3 visible3d.py
+    > python3 visible3d.py qhulldata/spheredata3 --viewpoint 0.1 0 0 --distances
+    > PYBOB_SPATIAL_TRACE=- python3 visible3d.py
+
 """
 #
 # Copyright (C)  Robert T. Short, 2019.
 #
 # Distributed under the same BSD license as Scipy.
 #
+import argparse
+
 import numpy
 
-from scipy.spatial import ConvexHull
 from pybob.spatial.qhullfile import readQhullFile
+from pybob.spatial.visibility import classifyFacets
 
 if __name__ == "__main__":
 
-    # Read the qhull file.
+    parser = argparse.ArgumentParser(description='Print the facets of the convex hull of a '
+                                     'qhull file that are and are not visible from a viewpoint.')
+    parser.add_argument('filename', nargs='?', default='qhulldata/spheredata1',
+                        help='qhull point file (default %(default)s)')
+    parser.add_argument('--viewpoint', nargs='+', type=float, metavar='X',
+                        help='viewpoint coordinates, for instance --viewpoint -1 0 0 '
+                        '(default the origin)')
+    parser.add_argument('--distances', action='store_true',
+                        help='also print the signed distance from the viewpoint to each facet')
+    args = parser.parse_args()
 
-    filename = 'qhulldata/spheredata1'
+    # Read the qhull file.
 
-    ndim,points  = readQhullFile(filename)
+    ndim,points  = readQhullFile(args.filename)
     npoints = len(points)
 
-    points  = numpy.vstack((points,numpy.zeros(ndim)))
+    if args.viewpoint is None:
+        viewpoint = numpy.zeros(ndim)
+    else:
+        viewpoint = numpy.array(args.viewpoint)
+        if len(viewpoint) != ndim:
+            parser.error('viewpoint is not %d-D' % ndim)
 
     print(ndim,npoints)
     print(points)
+    print('viewpoint', viewpoint)
 
     # Compute the visible and invisible facets.
 
-    qhull_options = "QG-"+str(npoints)
-    hull = ConvexHull(points, qhull_options=qhull_options)
-
-    print('Not visible from the origin')
-    print(hull.good)
-    print(hull.points)
-    print(hull.simplices)
-
-    qhull_options = "QG"+str(npoints)
-    hull = ConvexHull(points, qhull_options=qhull_options)
+    hull, visible, invisible, distances = classifyFacets(points, viewpoint)
 
-    print('Visible from the origin')
-    print(hull.good)
-    print(hull.points)
     print(hull.simplices)
 
-    print('Visible\n', hull.simplices[hull.good])
-    print('Not visible\n', hull.simplices[~hull.good])
+    print('Visible\n', hull.simplices[visible])
+    print('Not visible\n', hull.simplices[invisible])
 
+    if args.distances:
+        print('Distances\n', distances)
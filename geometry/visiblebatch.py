@@ -0,0 +1,76 @@
+"""
+visiblebatch - Visible facets of many qhull files.
+==================================================
+Python script to classify the facets of the convex hulls of a whole
+batch of qhull files as visible or not visible from a viewpoint.
+
+The files are given as directories, glob patterns or file names, and
+are read and hulled in a pool of worker processes.  The summary is
+written as JSON lines, one line per file, with the point and facet
+counts, the indices of the visible facets and the read and hull
+times.  A file that cannot be processed gets a line with an "error"
+entry instead.  With PYBOB_SPATIAL_TRACE set (see
+pybob.spatial.tracing), every worker also appends its spans for the
+reading and hulling of each file.
+
+Example
+-------
+From the command line::
+
+    > python3 visiblebatch.py qhulldata
+    > python3 visiblebatch.py 'qhulldata/sphere*' --workers -1 --output summary.jsonl
+    > python3 visiblebatch.py 'qhulldata/*' --viewpoint -1 0 0
+
+"""
+#
+# Copyright (C)  Robert T. Short, 2019.
+#
+# Distributed under the same BSD license as Scipy.
+#
+import argparse
+import json
+import sys
+import time
+
+import numpy
+
+from pybob.spatial.qhullfile import qhullFileNames
+from pybob.spatial.visibility import batchVisibility
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description='Classify the facets of the convex hulls of '
+                                     'many qhull files as visible or not from a viewpoint.')
+    parser.add_argument('sources', nargs='*', default=['qhulldata'],
+                        help='directories, glob patterns or qhull files (default %(default)s)')
+    parser.add_argument('--viewpoint', nargs='+', type=float, metavar='X',
+                        help='viewpoint coordinates, for instance --viewpoint -1 0 0 '
+                        '(default the origin)')
+    parser.add_argument('--workers', type=int, default=-1,
+                        help='number of worker processes, -1 for one per CPU (default %(default)s)')
+    parser.add_argument('--chunksize', type=int, default=16,
+                        help='files per worker task (default %(default)s)')
+    parser.add_argument('--output', '-o',
+                        help='summary file (default standard output)')
+    args = parser.parse_args()
+
+    viewpoint = None
+    if args.viewpoint is not None:
+        viewpoint = numpy.array(args.viewpoint)
+
+    filenames = qhullFileNames(args.sources)
+
+    out = open(args.output, 'w') if args.output else sys.stdout
+    start  = time.perf_counter()
+    failed = 0
+    try:
+        for summary in batchVisibility(filenames, viewpoint, workers=args.workers,
+                                       chunksize=args.chunksize):
+            failed += 'error' in summary
+            out.write(json.dumps(summary, separators=(',', ':')) + '\n')
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    print('%d files, %d failed, %.3f s' % (len(filenames), failed, time.perf_counter()-start),
+          file=sys.stderr)